@@ -0,0 +1,90 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+# Number of rows formatted and handed to the view at a time
+FETCH_BATCH_SIZE = 500
+
+# Width of the columns of a view on a DataFrameModel, in pixels. A fixed width
+# spares measuring the text of every loaded cell each time a sheet is shown
+DEFAULT_COLUMN_WIDTH = 120
+
+
+class DataFrameModel(QAbstractTableModel):
+    """Read-only table model that displays a pandas DataFrame.
+
+    The display text is built column by column, one batch of rows at a time,
+    so the view only does an array lookup for each cell it paints and no item
+    object is created per cell. Further batches are fetched as the view
+    scrolls, which keeps very large sheets quick to show.
+    """
+    def __init__(self, df=None, parent=None):
+        super().__init__(parent)
+        self.df = None
+        self.display = np.empty((0, 0), dtype=object)
+        self.missing = np.empty((0, 0), dtype=bool)
+        self.loaded_rows = 0
+        self.headers = []
+        if df is not None:
+            self.set_dataframe(df)
+
+    def set_dataframe(self, df):
+        """Replace the displayed DataFrame"""
+        self.beginResetModel()
+        self.df = df
+        self.display = np.empty(df.shape, dtype=object)
+        # Missing value mask of the whole frame, computed once
+        self.missing = df.isna().to_numpy()
+        self.loaded_rows = 0
+        self.format_rows(min(FETCH_BATCH_SIZE, len(df)))
+        self.headers = [str(col) for col in df.columns]
+        self.endResetModel()
+
+    def format_rows(self, stop):
+        """Build the display text of the next rows up to (not including) stop"""
+        start = self.loaded_rows
+        rows = self.df.iloc[start:stop]
+        for col, (_, column) in enumerate(rows.items()):
+            self.display[start:stop, col] = self.format_column(column, self.missing[start:stop, col])
+        self.loaded_rows = stop
+
+    @staticmethod
+    def format_column(column, missing):
+        """Return the display text of a column, with floats shown to 6 decimals"""
+        if column.dtype.kind == 'f':
+            text = [f'{val:.6f}' for val in column.tolist()]
+        else:
+            text = [f'{val:.6f}' if isinstance(val, (float, np.floating)) else str(val)
+                    for val in column.tolist()]
+        return ['' if is_missing else val for is_missing, val in zip(missing.tolist(), text)]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.display.shape[1]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded_rows < self.display.shape[0]
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        stop = min(self.loaded_rows + FETCH_BATCH_SIZE, self.display.shape[0])
+        if stop <= self.loaded_rows:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded_rows, stop - 1)
+        self.format_rows(stop)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self.display[index.row(), index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
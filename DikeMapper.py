@@ -6,22 +6,27 @@ from logging.handlers import RotatingFileHandler
 from pathlib import Path
 import pandas as pd
 import numpy as np
-from pyproj import Transformer, Geod
+from peewee import chunked
+from pyproj import Geod
 from geopy.distance import geodesic
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QLabel, QLineEdit, 
                             QTableWidget, QTableWidgetItem, QMessageBox, 
                             QFileDialog, QCheckBox, QHeaderView, QSizePolicy,
                             QLayout, QSplitter, QToolBar, QDialog, QDockWidget,
-                            QFormLayout, QTextEdit, QGroupBox, QDialogButtonBox)
+                            QFormLayout, QTextEdit, QGroupBox, QDialogButtonBox,
+                            QTableView)
 from PyQt5.QtCore import Qt, QUrl, QObject, pyqtSignal, QTimer, QSettings
 from PyQt5.QtWebChannel import QWebChannel
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
 from PyQt5.QtGui import QIcon, QFont
-from DikeModels import DikeRecord, init_database, db, DB_PATH, generate_sortable_id, SyncEvent
+from DikeModels import (DikeRecord, init_database, db, DB_PATH, generate_sortable_id, SyncEvent,
+                        SQLITE_MAX_VARIABLES)
 from SyncDialog import SyncDialog
+from DikeUtils import (fit_line, read_excel_columns, save_dataframe, dataframe_to_rows, PX_PER_CM,
+                       WGS84_TO_WEB_MERCATOR, WEB_MERCATOR_TO_WGS84)
+from DikeComponents import DataFrameModel, DEFAULT_COLUMN_WIDTH
 import shutil
-import pyproj
 
 # Company and program information
 COMPANY_NAME = "PaleoBytes"
@@ -41,6 +46,9 @@ DB_BACKUP_DIRECTORY = os.path.join(DEFAULT_DB_DIRECTORY, "backups/")
 for directory in [DEFAULT_DB_DIRECTORY, DEFAULT_STORAGE_DIRECTORY, DEFAULT_LOG_DIRECTORY, DB_BACKUP_DIRECTORY]:
     os.makedirs(directory, exist_ok=True)
 
+# WGS84 ellipsoid for geodesic calculations, created once
+WGS84_GEOD = Geod(ellps="WGS84")
+
 # Check if WebEngine is available
 try:
     from PyQt5.QtWebEngineWidgets import QWebEngineView
@@ -110,11 +118,7 @@ class EditDialog(QDialog):
         self.initUI()
         
         # Initialize coordinate transformer
-        self.transformer = pyproj.Transformer.from_crs(
-            "EPSG:3857",  # source CRS
-            "EPSG:4326",  # target CRS
-            always_xy=True
-        )
+        self.transformer = WEB_MERCATOR_TO_WGS84
         
     def initUI(self):
         self.setWindowTitle("Edit Record")
@@ -322,14 +326,15 @@ class ExcelConverterWindow(QDialog):
         self.save_button.setEnabled(False)  # Initially disabled
         
        
-        # Create table widget
-        self.table_widget = QTableWidget(self)
-        self.table_widget.setColumnCount(0)
-        self.table_widget.setRowCount(0)
+        # Create table view
+        self.table_model = DataFrameModel()
+        self.table_view = QTableView(self)
+        self.table_view.setModel(self.table_model)
+        self.table_view.horizontalHeader().setDefaultSectionSize(DEFAULT_COLUMN_WIDTH)
         
         # Add widgets to layout
         main_layout.addWidget(self.load_button)
-        main_layout.addWidget(self.table_widget)
+        main_layout.addWidget(self.table_view)
         main_layout.addWidget(self.save_button)
         
         # Set the layout
@@ -343,28 +348,8 @@ class ExcelConverterWindow(QDialog):
         if self.df is None:
             return
             
-        # Set table dimensions
-        self.table_widget.setRowCount(len(self.df))
-        self.table_widget.setColumnCount(len(self.df.columns))
-        
-        # Set headers
-        self.table_widget.setHorizontalHeaderLabels(self.df.columns)
-        
-        # Fill data
-        for i in range(len(self.df)):
-            for j in range(len(self.df.columns)):
-                val = self.df.iloc[i, j]
-                if pd.isna(val):
-                    item = QTableWidgetItem('')
-                else:
-                    if isinstance(val, (float, np.float64)):
-                        item = QTableWidgetItem(f'{val:.6f}')
-                    else:
-                        item = QTableWidgetItem(str(val))
-                self.table_widget.setItem(i, j, item)
-        
-        # Adjust column widths
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        # The model formats cells on demand, only for the rows in view
+        self.table_model.set_dataframe(self.df)
 
     def save_to_database(self):
         """Save the processed data to the database"""
@@ -389,9 +374,7 @@ class ExcelConverterWindow(QDialog):
                 'Calculated_Lng': 'lng_1'
             }
             required_column = ['거리 (km)', '각도', 'X_3857', 'Y_3857']
-            for idx, row in self.df.iterrows():
-                if row[required_column].isna().all():
-                    self.df = self.df.drop(idx)
+            self.df = self.df.dropna(subset=required_column, how='all')
             
             # Convert distance from km to meters
             if '거리 (km)' in self.df.columns:
@@ -399,42 +382,35 @@ class ExcelConverterWindow(QDialog):
 
             # Fix angle calculation
             if '각도' in self.df.columns:
-                # Apply the angle transformation row by row
-                self.df['각도'] = self.df['각도'].apply(lambda x: (90 - x + 360) % 360 if pd.notnull(x) else x)
+                self.df['각도'] = (90 - self.df['각도'] + 360) % 360
 
             # Create records for each row
             with db.atomic() as transaction:
                 try:
-                    records = []
-                    used_ids = set()  # Track used IDs
-                    for _, row in self.df.iterrows():
-                        record_data = {}
-                        for excel_col, db_field in column_mapping.items():
-                            if excel_col in self.df.columns:
-                                value = row[excel_col]
-                                # Convert NaN to None for database
-                                if pd.isna(value):
-                                    value = None
-                                record_data[db_field] = value
-                        
+                    records = dataframe_to_rows(self.df, column_mapping)
+                    # Load the existing IDs once instead of querying for every record
+                    used_ids = {uid for (uid,) in DikeRecord.select(DikeRecord.unique_id).tuples()}
+                    # One timestamp for the whole import instead of two per record
+                    now = datetime.datetime.now()
+                    for record_data in records:
                         # Generate unique_id and ensure it's not already used
-                        while True:
+                        unique_id = generate_sortable_id()
+                        while unique_id in used_ids:
                             unique_id = generate_sortable_id()
-                            if unique_id not in used_ids and not DikeRecord.select().where(DikeRecord.unique_id == unique_id).exists():
-                                used_ids.add(unique_id)
-                                break
-                        
+                        used_ids.add(unique_id)
+
                         record_data['unique_id'] = unique_id
                         # Set is_deleted to False for new records
                         record_data['is_deleted'] = False
-                        records.append(DikeRecord(**record_data))
-                    
-                    # Bulk insert records in chunks to avoid SQLite limitations
-                    chunk_size = 100
-                    for i in range(0, len(records), chunk_size):
-                        chunk = records[i:i + chunk_size]
-                        DikeRecord.bulk_create(chunk)
-                    
+                        record_data['created_date'] = now
+                        record_data['modified_date'] = now
+
+                    # Insert plain rows in chunks that stay under SQLite's parameter limit
+                    if records:
+                        chunk_size = SQLITE_MAX_VARIABLES // len(records[0])
+                        for chunk in chunked(records, chunk_size):
+                            DikeRecord.insert_many(chunk).execute()
+
                     QMessageBox.information(self, "Database Save Complete", 
                         f"Successfully saved {len(records)} records to the database.")
                         
@@ -464,17 +440,11 @@ class ExcelConverterWindow(QDialog):
         try:
             # waitcursor
             QApplication.setOverrideCursor(Qt.WaitCursor)
-            # Read the Excel file
-            self.df = pd.read_excel(file_name)
             column_header_text = "지역	기호	지층	대표암상	시대	각도	거리 (km)	주소	색	좌표 X	좌표 Y	사진 이름	코드1 좌표 Lat	코드 1 좌표 Lng"
             column_header_list = column_header_text.split('\t')
             
-            # Remove unnecessary columns
-            columns_to_keep = [col for col in column_header_list if col in self.df.columns]
-            columns_to_remove = [col for col in self.df.columns if col not in column_header_list]
-            if columns_to_remove:
-                self.df = self.df.drop(columns=columns_to_remove)
-                print(f"Removed unnecessary columns: {', '.join(columns_to_remove)}")
+            # Read the Excel file, skipping unnecessary columns while parsing
+            self.df = read_excel_columns(file_name, column_header_list)
             
             # Define column names
             image_col = '사진 이름'
@@ -483,186 +453,150 @@ class ExcelConverterWindow(QDialog):
             lat_col = '코드1 좌표 Lat'
             lng_col = '코드 1 좌표 Lng'
             
-            # Add new columns for calculated coordinates
-            self.df['X_3857'] = np.nan
-            self.df['Y_3857'] = np.nan
-            self.df['Calculated_Lat'] = np.nan
-            self.df['Calculated_Lng'] = np.nan
-            self.df['Pixel_X'] = np.nan
-            self.df['Pixel_Y'] = np.nan
-            self.df['Pixel_Y_Flipped'] = np.nan
-            
-            # Copy existing lat/lng values to calculated columns
-            # Convert to numeric and handle non-numeric values (like '맥모양') as null
-            self.df['Calculated_Lat'] = pd.to_numeric(self.df[lat_col], errors='coerce')
-            self.df['Calculated_Lng'] = pd.to_numeric(self.df[lng_col], errors='coerce')
-            
-            # Create a transformer from WGS84 (EPSG:4326) to Web Mercator (EPSG:3857)
-            transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
-            transformer_back = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
-            
-            # Convert coordinate columns to float, replacing any non-numeric values with NaN
-            for col in [x_col, y_col,lat_col,lng_col]:
-                self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+            # Add new columns for calculated coordinates with a single allocation
+            new_columns = ['X_3857', 'Y_3857', 'Calculated_Lat', 'Calculated_Lng',
+                           'Pixel_X', 'Pixel_Y', 'Pixel_Y_Flipped']
+            self.df[new_columns] = np.full((len(self.df), len(new_columns)), np.nan)
             
-            # Constants for coordinate conversion
-            CM_TO_INCH = 0.393701  # 1 cm = 0.393701 inches
-            DPI = 96  # dots per inch
+            # Convert coordinate columns to numbers, replacing any non-numeric values
+            # (like '맥모양') with NaN
+            for col in [x_col, y_col, lat_col, lng_col]:
+                self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
             
-            # Process each image group
-            image_groups = self.df.groupby(image_col)
+            # Copy existing lat/lng values to calculated columns as plain float64
+            self.df['Calculated_Lat'] = self.df[lat_col].astype('float64')
+            self.df['Calculated_Lng'] = self.df[lng_col].astype('float64')
+            
+            # Transformers between WGS84 (EPSG:4326) and Web Mercator (EPSG:3857)
+            transformer = WGS84_TO_WEB_MERCATOR
+            transformer_back = WEB_MERCATOR_TO_WGS84
+            
+            # Pixel positions of every row as float64, converted from cm once unless the
+            # coordinates are all whole numbers (pixels). The dtype alone cannot tell,
+            # since an empty cell turns an integer pixel column into floats.
+            pixel_x = self.df[x_col].astype('float64')
+            pixel_y = self.df[y_col].astype('float64')
+            if not ((pixel_x.dropna() % 1 == 0).all() and (pixel_y.dropna() % 1 == 0).all()):
+                pixel_x = (pixel_x * PX_PER_CM).round()
+                pixel_y = (pixel_y * PX_PER_CM).round()
+            
+            # Transform all known lat/lng coordinates to EPSG:3857 in one call
+            known = self.df[lat_col].notna() & self.df[lng_col].notna()
+            if known.any():
+                x_3857, y_3857 = transformer.transform(self.df['Calculated_Lng'].to_numpy()[known],
+                                                       self.df['Calculated_Lat'].to_numpy()[known])
+                self.df.loc[known, 'X_3857'] = x_3857
+                self.df.loc[known, 'Y_3857'] = y_3857
+            
+            # Number of rows of each image, and its rows with known lat/lng coordinates
+            image_sizes = self.df.groupby(image_col).size()
+            known_by_image = dict(list(self.df[known].groupby(image_col)))
+            
+            # Maximum y pixel of the known coordinates of each image, used to invert the y axis
+            max_y_by_image = pixel_y[known].groupby(self.df.loc[known, image_col]).max()
             
             # Store transformation parameters for each image
             image_transforms = {}
+            # Images with enough known coordinates to show their control points
+            control_images = []
             
             # First pass: Calculate transformation parameters for each image
-            for image_name, group_df in image_groups:
-                print(f"\nProcessing image: {image_name}")
-                print(f"Number of rows: {len(group_df)}")
+            for image_name, image_size in image_sizes.items():
+                logging.debug("Processing image: %s (%d rows)", image_name, image_size)
                 
                 # Get rows with lat/lng coordinates
-                known_coords = group_df[group_df[lat_col].notna() & group_df[lng_col].notna()]
+                known_coords = known_by_image.get(image_name)
                 
-                if len(known_coords) >= 2:
-                    print(f"Found {len(known_coords)} rows with known coordinates")
+                if known_coords is not None and len(known_coords) >= 2:
+                    logging.debug("Found %d rows with known coordinates", len(known_coords))
+                    control_images.append(image_name)
                     
-                    # Lists to store coordinates
-                    x_pixels = []
-                    y_pixels = []
-                    x_3857_coords = []
-                    y_3857_coords = []
-                    max_y = float('-inf')
+                    max_y = max_y_by_image[image_name]
                     
-                    # First pass to find maximum y value
-                    for _, row in known_coords.iterrows():
-                        y_cm = row[y_col]
-                        if pd.notna(y_cm):
-                            if isinstance(y_cm, float):
-                                y_val = round(y_cm * CM_TO_INCH * DPI)
-                            else:
-                                y_val = y_cm
-                            max_y = max(max_y, y_val)
+                    # Process known coordinates that have pixel positions
+                    valid = known_coords[known_coords[x_col].notna() & known_coords[y_col].notna()]
                     
-                    # Process known coordinates
-                    for _, row in known_coords.iterrows():
-                        try:
-                            # Convert cm to pixels if the coordinates are floats
-                            x_cm, y_cm = row[x_col], row[y_col]
-                            if isinstance(x_cm, float) and isinstance(y_cm, float):
-                                x_val = round(x_cm * CM_TO_INCH * DPI)
-                                y_val = round(y_cm * CM_TO_INCH * DPI)
-                            else:
-                                x_val = x_cm
-                                y_val = y_cm
-                            
-                            # Store pixel coordinates
-                            self.df.at[row.name, 'Pixel_X'] = x_val
-                            self.df.at[row.name, 'Pixel_Y'] = y_val
-                            
-                            # Invert y coordinate
-                            y_val_flipped = max_y - y_val
-                            self.df.at[row.name, 'Pixel_Y_Flipped'] = y_val_flipped
-                            
-                            # Transform lat/lng to EPSG:3857
-                            x_3857, y_3857 = transformer.transform(row[lng_col], row[lat_col])
-                            self.df.at[row.name, 'X_3857'] = x_3857
-                            self.df.at[row.name, 'Y_3857'] = y_3857
-                            
-                            x_pixels.append(x_val)
-                            y_pixels.append(y_val_flipped)
-                            x_3857_coords.append(x_3857)
-                            y_3857_coords.append(y_3857)
-                            
-                        except Exception as e:
-                            print(f"Error transforming coordinates for row {row.name}: {str(e)}")
-                            continue
+                    # Invert y coordinate of the pixel positions
+                    x_pixels = pixel_x[valid.index].to_numpy()
+                    y_pixels = max_y - pixel_y[valid.index].to_numpy()
+                    
+                    # EPSG:3857 coordinates were transformed above
+                    x_3857_coords = valid['X_3857'].to_numpy()
+                    y_3857_coords = valid['Y_3857'].to_numpy()
                     
                     if len(x_pixels) >= 2:
-                        # Convert to numpy arrays
-                        x_pixels = np.array(x_pixels)
-                        y_pixels = np.array(y_pixels)
-                        x_3857_coords = np.array(x_3857_coords)
-                        y_3857_coords = np.array(y_3857_coords)
-                        
                         try:
                             # Calculate x transformation (simple linear regression)
-                            A_x = np.vstack([x_pixels, np.ones(len(x_pixels))]).T
-                            x_slope, x_intercept = np.linalg.lstsq(A_x, x_3857_coords, rcond=None)[0]
+                            x_slope, x_intercept = fit_line(x_pixels, x_3857_coords)
                             
                             # Calculate y transformation (simple linear regression)
-                            A_y = np.vstack([y_pixels, np.ones(len(y_pixels))]).T
-                            y_slope, y_intercept = np.linalg.lstsq(A_y, y_3857_coords, rcond=None)[0]
+                            y_slope, y_intercept = fit_line(y_pixels, y_3857_coords)
                             
                             # Store transformation parameters
                             image_transforms[image_name] = {
-                                'max_y': max_y,
                                 'x_slope': x_slope,
                                 'x_intercept': x_intercept,
                                 'y_slope': y_slope,
                                 'y_intercept': y_intercept
                             }
                             
-                            print(f"\nTransformation parameters for {image_name}:")
-                            print(f"X_3857 = {x_slope:.6f} * x_pixel + {x_intercept:.6f}")
-                            print(f"Y_3857 = {y_slope:.6f} * y_pixel + {y_intercept:.6f}")
+                            logging.debug("Transformation parameters for %s: "
+                                          "X_3857 = %.6f * x_pixel + %.6f, Y_3857 = %.6f * y_pixel + %.6f",
+                                          image_name, x_slope, x_intercept, y_slope, y_intercept)
                             
                         except np.linalg.LinAlgError as e:
-                            print(f"Error calculating transformation for {image_name}: {str(e)}")
+                            logging.warning("Error calculating transformation for %s: %s", image_name, e)
                     else:
-                        print(f"Not enough valid coordinates for {image_name}")
+                        logging.debug("Not enough valid coordinates for %s", image_name)
                 else:
-                    print(f"Not enough known coordinates for {image_name}")
+                    logging.debug("Not enough known coordinates for %s", image_name)
             
             # Second pass: Calculate coordinates for all rows
-            print("\nCalculating coordinates for all rows...")
-            
-            for idx, row in self.df.iterrows():
-                image_name = row[image_col]
-                transform = image_transforms.get(image_name)
-                
-                if transform is None:
-                    print(f"No transformation available for image {image_name}")
-                    continue
-                
-                try:
-                    # Convert coordinates
-                    x_cm, y_cm = row[x_col], row[y_col]
-                    if pd.notna(x_cm) and pd.notna(y_cm):
-                        if isinstance(x_cm, float) and isinstance(y_cm, float):
-                            x_val = round(x_cm * CM_TO_INCH * DPI)
-                            y_val = round(y_cm * CM_TO_INCH * DPI)
-                        else:
-                            x_val = x_cm
-                            y_val = y_cm
-                        
-                        # Store pixel coordinates if not already stored
-                        if pd.isna(self.df.at[idx, 'Pixel_X']):
-                            self.df.at[idx, 'Pixel_X'] = x_val
-                            self.df.at[idx, 'Pixel_Y'] = y_val
-                        
-                        # Invert y coordinate
-                        y_val_flipped = transform['max_y'] - y_val
-                        if pd.isna(self.df.at[idx, 'Pixel_Y_Flipped']):
-                            self.df.at[idx, 'Pixel_Y_Flipped'] = y_val_flipped
-                        
-                        # Calculate EPSG:3857 coordinates
-                        x_3857 = transform['x_slope'] * x_val + transform['x_intercept']
-                        y_3857 = transform['y_slope'] * y_val_flipped + transform['y_intercept']
-                        
-                        # Store EPSG:3857 coordinates if not already stored
-                        if pd.isna(self.df.at[idx, 'X_3857']):
-                            self.df.at[idx, 'X_3857'] = x_3857
-                            self.df.at[idx, 'Y_3857'] = y_3857
-                        
-                        # Calculate and store WGS84 coordinates if not already present
-                        if pd.isna(row[lat_col]) or pd.isna(row[lng_col]):
-                            lng, lat = transformer_back.transform(x_3857, y_3857)
-                            self.df.at[idx, 'Calculated_Lat'] = lat
-                            self.df.at[idx, 'Calculated_Lng'] = lng
-                        
-                except Exception as e:
-                    print(f"Error processing row {idx}: {str(e)}")
-                    continue
+            logging.debug("Calculating coordinates for all rows")
+            
+            # Number each image with a transformation once, so that its parameters
+            # can be looked up for every row by array indexing
+            image_ids = self.df[image_col].map(
+                {image_name: i for i, image_name in enumerate(image_transforms)})
+            has_transform = image_ids.notna()
+            for image_name in self.df.loc[~has_transform, image_col].unique():
+                logging.debug("No transformation available for image %s", image_name)
+            
+            # Store pixel positions for every row of an image with a transformation,
+            # and for the known coordinates of the other images with control points
+            has_pixels = self.df[x_col].notna() & self.df[y_col].notna()
+            shown = has_pixels & (has_transform | (known & self.df[image_col].isin(control_images)))
+            self.df.loc[shown, 'Pixel_X'] = pixel_x[shown]
+            self.df.loc[shown, 'Pixel_Y'] = pixel_y[shown]
+            self.df.loc[shown, 'Pixel_Y_Flipped'] = (self.df[image_col].map(max_y_by_image) - pixel_y)[shown]
+            
+            valid = (has_transform & has_pixels).to_numpy()
+            if valid.any():
+                ids = image_ids.to_numpy()[valid].astype(int)
+                # One (images x parameters) table, gathered for all rows with a single take
+                params = np.array([
+                    [transform['x_slope'], transform['x_intercept'],
+                     transform['y_slope'], transform['y_intercept']]
+                    for transform in image_transforms.values()
+                ])
+                x_slope, x_intercept, y_slope, y_intercept = params.take(ids, axis=0).T
+                
+                # Calculate EPSG:3857 coordinates from the pixel positions stored above
+                x_3857 = x_slope * self.df['Pixel_X'].to_numpy()[valid] + x_intercept
+                y_3857 = y_slope * self.df['Pixel_Y_Flipped'].to_numpy()[valid] + y_intercept
+                
+                # Keep the transformed known coordinates, fill in the rest
+                rows = self.df.index[valid]
+                fill = self.df['X_3857'].isna().to_numpy()[valid]
+                self.df.loc[rows[fill], 'X_3857'] = x_3857[fill]
+                self.df.loc[rows[fill], 'Y_3857'] = y_3857[fill]
+                
+                # Calculate WGS84 coordinates where not already present
+                fill = (self.df[lat_col].isna() | self.df[lng_col].isna()).to_numpy()[valid]
+                if fill.any():
+                    lngs, lats = transformer_back.transform(x_3857[fill], y_3857[fill])
+                    self.df.loc[rows[fill], 'Calculated_Lat'] = lats
+                    self.df.loc[rows[fill], 'Calculated_Lng'] = lngs
             
             # Update the table with the new data
             self.update_table()
@@ -685,16 +619,20 @@ class ExcelConverterWindow(QDialog):
         if self.df is None:
             return
             
-        file_name, _ = QFileDialog.getSaveFileName(
-            self, "Save Excel File", "", "Excel Files (*.xlsx);;All Files (*)"
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save Excel File", "",
+            "Excel Files (*.xlsx);;Parquet Files (*.parquet);;All Files (*)"
         )
         
         if not file_name:
             return  # User canceled
+        
+        if selected_filter.startswith("Parquet") and not file_name.lower().endswith('.parquet'):
+            file_name += '.parquet'
             
         try:
-            # Save the DataFrame to Excel
-            self.df.to_excel(file_name, index=False)
+            # Save the DataFrame to Excel (or Parquet)
+            save_dataframe(self.df, file_name)
             QMessageBox.information(self, "Save Complete", 
                 f"Data has been saved to:\n{file_name}")
         except Exception as e:
@@ -1357,88 +1295,97 @@ class KIGAMMapWindow(QMainWindow):
                     self.geo_table.setColumnWidth(col, column_widths[header])
             
             # Load records from database (only active records)
-            records = DikeRecord.active().order_by(DikeRecord.created_date)
+            records = list(DikeRecord.active().order_by(DikeRecord.created_date))
             
-            for record in records:
-                row = self.geo_table.rowCount()
-                self.geo_table.insertRow(row)
+            # Fill the table with repaints, signals and sorting suspended
+            sorting_enabled = self.geo_table.isSortingEnabled()
+            self.geo_table.setUpdatesEnabled(False)
+            self.geo_table.setSortingEnabled(False)
+            self.geo_table.blockSignals(True)
+            try:
+                self.geo_table.setRowCount(len(records))
+                for row, record in enumerate(records):
                 
-                # Add ID to table
-                self.geo_table.setItem(row, 0, QTableWidgetItem(str(record.id)))
+                    # Add ID to table
+                    self.geo_table.setItem(row, 0, QTableWidgetItem(str(record.id)))
                 
-                # Add basic information to table
-                self.geo_table.setItem(row, 1, QTableWidgetItem(record.symbol or ""))
-                self.geo_table.setItem(row, 2, QTableWidgetItem(record.stratum or ""))
-                self.geo_table.setItem(row, 3, QTableWidgetItem(record.rock_type or ""))
-                self.geo_table.setItem(row, 4, QTableWidgetItem(record.era or ""))
-                self.geo_table.setItem(row, 5, QTableWidgetItem(record.map_sheet or ""))
-                self.geo_table.setItem(row, 6, QTableWidgetItem(record.address or ""))
+                    # Add basic information to table
+                    self.geo_table.setItem(row, 1, QTableWidgetItem(record.symbol or ""))
+                    self.geo_table.setItem(row, 2, QTableWidgetItem(record.stratum or ""))
+                    self.geo_table.setItem(row, 3, QTableWidgetItem(record.rock_type or ""))
+                    self.geo_table.setItem(row, 4, QTableWidgetItem(record.era or ""))
+                    self.geo_table.setItem(row, 5, QTableWidgetItem(record.map_sheet or ""))
+                    self.geo_table.setItem(row, 6, QTableWidgetItem(record.address or ""))
                 
-                # Add distance and angle if available
-                try:
-                    if record.distance is not None:
-                        self.geo_table.setItem(row, 7, QTableWidgetItem(f"{float(record.distance):.1f}m"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 7, QTableWidgetItem(""))
+                    # Add distance and angle if available
+                    try:
+                        if record.distance is not None:
+                            self.geo_table.setItem(row, 7, QTableWidgetItem(f"{float(record.distance):.1f}m"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 7, QTableWidgetItem(""))
                     
-                try:
-                    if record.angle is not None:
-                        self.geo_table.setItem(row, 8, QTableWidgetItem(f"{float(record.angle):.1f}°"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 8, QTableWidgetItem(""))
+                    try:
+                        if record.angle is not None:
+                            self.geo_table.setItem(row, 8, QTableWidgetItem(f"{float(record.angle):.1f}°"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 8, QTableWidgetItem(""))
                 
-                # Add first set of coordinates (X1, Y1, Lat1, Lng1)
-                try:
-                    if record.x_coord_1 is not None:
-                        self.geo_table.setItem(row, 9, QTableWidgetItem(f"{float(record.x_coord_1):.3f}"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 9, QTableWidgetItem(""))
+                    # Add first set of coordinates (X1, Y1, Lat1, Lng1)
+                    try:
+                        if record.x_coord_1 is not None:
+                            self.geo_table.setItem(row, 9, QTableWidgetItem(f"{float(record.x_coord_1):.3f}"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 9, QTableWidgetItem(""))
                     
-                try:
-                    if record.y_coord_1 is not None:
-                        self.geo_table.setItem(row, 10, QTableWidgetItem(f"{float(record.y_coord_1):.3f}"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 10, QTableWidgetItem(""))
+                    try:
+                        if record.y_coord_1 is not None:
+                            self.geo_table.setItem(row, 10, QTableWidgetItem(f"{float(record.y_coord_1):.3f}"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 10, QTableWidgetItem(""))
                     
-                try:
-                    if record.lat_1 is not None:
-                        self.geo_table.setItem(row, 11, QTableWidgetItem(f"{float(record.lat_1):.6f}"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 11, QTableWidgetItem(""))
+                    try:
+                        if record.lat_1 is not None:
+                            self.geo_table.setItem(row, 11, QTableWidgetItem(f"{float(record.lat_1):.6f}"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 11, QTableWidgetItem(""))
                     
-                try:
-                    if record.lng_1 is not None:
-                        self.geo_table.setItem(row, 12, QTableWidgetItem(f"{float(record.lng_1):.6f}"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 12, QTableWidgetItem(""))
+                    try:
+                        if record.lng_1 is not None:
+                            self.geo_table.setItem(row, 12, QTableWidgetItem(f"{float(record.lng_1):.6f}"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 12, QTableWidgetItem(""))
                 
-                # Add second set of coordinates (X2, Y2, Lat2, Lng2)
-                try:
-                    if record.x_coord_2 is not None:
-                        self.geo_table.setItem(row, 13, QTableWidgetItem(f"{float(record.x_coord_2):.3f}"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 13, QTableWidgetItem(""))
+                    # Add second set of coordinates (X2, Y2, Lat2, Lng2)
+                    try:
+                        if record.x_coord_2 is not None:
+                            self.geo_table.setItem(row, 13, QTableWidgetItem(f"{float(record.x_coord_2):.3f}"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 13, QTableWidgetItem(""))
                     
-                try:
-                    if record.y_coord_2 is not None:
-                        self.geo_table.setItem(row, 14, QTableWidgetItem(f"{float(record.y_coord_2):.3f}"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 14, QTableWidgetItem(""))
+                    try:
+                        if record.y_coord_2 is not None:
+                            self.geo_table.setItem(row, 14, QTableWidgetItem(f"{float(record.y_coord_2):.3f}"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 14, QTableWidgetItem(""))
                     
-                try:
-                    if record.lat_2 is not None:
-                        self.geo_table.setItem(row, 15, QTableWidgetItem(f"{float(record.lat_2):.6f}"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 15, QTableWidgetItem(""))
+                    try:
+                        if record.lat_2 is not None:
+                            self.geo_table.setItem(row, 15, QTableWidgetItem(f"{float(record.lat_2):.6f}"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 15, QTableWidgetItem(""))
                     
-                try:
-                    if record.lng_2 is not None:
-                        self.geo_table.setItem(row, 16, QTableWidgetItem(f"{float(record.lng_2):.6f}"))
-                except (ValueError, TypeError):
-                    self.geo_table.setItem(row, 16, QTableWidgetItem(""))
-            
-            # Adjust column widths
-            self.geo_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+                    try:
+                        if record.lng_2 is not None:
+                            self.geo_table.setItem(row, 16, QTableWidgetItem(f"{float(record.lng_2):.6f}"))
+                    except (ValueError, TypeError):
+                        self.geo_table.setItem(row, 16, QTableWidgetItem(""))
+            finally:
+                self.geo_table.blockSignals(False)
+                self.geo_table.setSortingEnabled(sorting_enabled)
+                self.geo_table.setUpdatesEnabled(True)
+            
+            # Size the columns to their contents once, keeping them resizable by hand
+            self.geo_table.resizeColumnsToContents()
             
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Error loading data from database: {str(e)}")
@@ -2705,7 +2652,7 @@ class KIGAMMapWindow(QMainWindow):
             self.statusBar().showMessage("Table is already empty", 3000)
     
     def export_geo_table(self):
-        """Export the geological data table to a file (CSV, TSV, or Excel)"""
+        """Export the geological data table to a file (CSV, TSV, Excel or Parquet)"""
         if self.geo_table.rowCount() == 0:
             QMessageBox.warning(self, "Export Error", "No data to export")
             return
@@ -2715,11 +2662,17 @@ class KIGAMMapWindow(QMainWindow):
             self, 
             "Export Geological Data", 
             "", 
-            "CSV Files (*.csv);;TSV Files (*.tsv);;Excel Files (*.xlsx);;All Files (*)"
+            "CSV Files (*.csv);;TSV Files (*.tsv);;Excel Files (*.xlsx);;Parquet Files (*.parquet);;All Files (*)"
         )
         
         if not file_name:
             return  # User canceled
+        
+        # Add the extension of the selected format if the name has none of ours,
+        # otherwise nothing would be written below
+        extensions = {'CSV': '.csv', 'TSV': '.tsv', 'Excel': '.xlsx', 'Parquet': '.parquet'}
+        if not file_name.lower().endswith(tuple(extensions.values())):
+            file_name += extensions.get(selected_filter.split(' ')[0], '.csv')
             
         try:
             # Get all data from the table
@@ -2750,10 +2703,9 @@ class KIGAMMapWindow(QMainWindow):
                     writer = csv.writer(file, delimiter='\t')
                     writer.writerows(data)
                     
-            elif file_name.lower().endswith('.xlsx'):
-                import pandas as pd
+            elif file_name.lower().endswith(('.xlsx', '.parquet')):
                 df = pd.DataFrame(data[1:], columns=data[0])
-                df.to_excel(file_name, index=False)
+                save_dataframe(df, file_name)
                 
             self.statusBar().showMessage(f"Data exported successfully to {file_name}", 3000)
             
@@ -3576,9 +3528,7 @@ class KIGAMMapWindow(QMainWindow):
         Returns:
             (lat2, lon2): Tuple of destination coordinates
         """
-        # Initialize WGS84 ellipsoid
-        geod = Geod(ellps="WGS84")
-        lon2, lat2, _ = geod.fwd(lon1, lat1, bearing_deg, distance_m)
+        lon2, lat2, _ = WGS84_GEOD.fwd(lon1, lat1, bearing_deg, distance_m)
         return lat2, lon2
 
     def center_map_on_selected(self):
@@ -3819,19 +3769,14 @@ class KIGAMMapWindow(QMainWindow):
     def get_records_to_sync(self):
         """Get all records that need to be synced, including deleted ones"""
         try:
-            # Get all records from the table first
-            table_records = set()
-            for row in range(self.geo_table.rowCount()):
-                record_id = self.geo_table.item(row, 0).text()
-                table_records.add(int(record_id))
-            
             # Get all records from database (both active and deleted)
             all_records = DikeRecord.all_records().where(
                 (DikeRecord.last_sync_date.is_null()) |  # Never synced
                 (DikeRecord.modified_date > DikeRecord.last_sync_date)  # Modified since last sync
             )
             
-            return list(all_records)
+            # Plain row dicts are all the sync worker needs; skip building model instances
+            return list(all_records.dicts().iterator())
             
         except Exception as e:
             QMessageBox.warning(self, "Error", 
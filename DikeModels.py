@@ -16,14 +16,19 @@ DB_PATH = os.path.join(SCRIPT_DIR, 'dikemapper.db')
 # Initialize the database with SQLite
 db = SqliteDatabase(None)  # Initialize without path
 
+# SQLite builds before 3.32 accept at most 999 bound parameters per statement
+SQLITE_MAX_VARIABLES = 999
+
+# Alphabet for base62 encoding of unique ids
+BASE62_CHARS = string.digits + string.ascii_letters
+BASE62 = len(BASE62_CHARS)
+
 def base62_encode(num):
-    chars = string.digits + string.ascii_letters
-    base = len(chars)
-    result = ''
+    digits = []
     while num > 0:
-        num, rem = divmod(num, base)
-        result = chars[rem] + result
-    return result or '0'
+        num, rem = divmod(num, BASE62)
+        digits.append(BASE62_CHARS[rem])
+    return ''.join(reversed(digits)) or '0'
 
 def generate_sortable_id(length=10):
     t = int(time.time() * 1000)  # current time in ms
@@ -135,14 +140,16 @@ def init_database(custom_path=None):
     if custom_path:
         DB_PATH = custom_path
     
-    # Initialize database with the path
-    db.init(DB_PATH)
+    # Initialize database with the path. WAL lets the sync thread write without
+    # blocking readers, and synchronous=NORMAL is safe in WAL mode.
+    db.init(DB_PATH, pragmas={'journal_mode': 'wal', 'synchronous': 'normal'})
     db.connect()
     
     try:
-        # Let the migration system handle everything
+        # Let the migration system handle everything, in a single transaction
         print("Checking database schema and applying migrations...")
-        apply_migrations(db)
+        with db.atomic(lock_type='IMMEDIATE'):
+            apply_migrations(db)
     except Exception as e:
         print(f"Error initializing database: {str(e)}")
         raise
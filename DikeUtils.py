@@ -0,0 +1,131 @@
+import pandas as pd
+import numpy as np
+import openpyxl
+from pyproj import Transformer
+
+# Building a Transformer initializes PROJ and parses both CRSs, so create them once
+WGS84_TO_WEB_MERCATOR = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+WEB_MERCATOR_TO_WGS84 = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
+
+# Image coordinates given in cm are converted to pixels at 96 DPI (1 cm = 0.393701 inches)
+PX_PER_CM = 0.393701 * 96
+
+# Prefer the Rust based calamine reader when python-calamine is installed. pandas
+# only has a calamine engine from 2.2, but the workbook can be read with it directly
+try:
+    from python_calamine import CalamineWorkbook
+    _PANDAS_VERSION = tuple(int(v) for v in pd.__version__.split('.')[:2])
+    EXCEL_READER_ENGINE = 'calamine' if _PANDAS_VERSION >= (2, 2) else None
+except ImportError:
+    CalamineWorkbook = None
+    EXCEL_READER_ENGINE = None
+
+# Prefer the faster xlsxwriter engine for writing Excel files when installed.
+# Its URL detection regex runs on every string cell, so it is switched off;
+# constant_memory is not usable because pandas writes cells column by column.
+try:
+    import xlsxwriter
+    EXCEL_WRITER_ENGINE = 'xlsxwriter'
+    EXCEL_WRITER_KWARGS = {'options': {'strings_to_urls': False}}
+except ImportError:
+    EXCEL_WRITER_ENGINE = 'openpyxl'
+    EXCEL_WRITER_KWARGS = {}
+
+
+def read_excel(file_name, **kwargs):
+    """Read an Excel file into a DataFrame using the fastest available engine"""
+    if EXCEL_READER_ENGINE and 'engine' not in kwargs:
+        kwargs['engine'] = EXCEL_READER_ENGINE
+    return pd.read_excel(file_name, **kwargs)
+
+
+def read_excel_columns(file_name, columns):
+    """Read only the given columns of the first sheet of an Excel file.
+
+    The sheet is read with python-calamine when it is installed, or else
+    streamed with openpyxl in read-only mode. Either way the rows are taken
+    as plain values, which skips the per-cell conversion pandas does on top.
+    """
+    wanted = set(columns)
+    if CalamineWorkbook is not None:
+        rows = iter(CalamineWorkbook.from_path(file_name).get_sheet_by_index(0).to_python())
+        header, data, last_filled = _collect_columns(rows, wanted, '', _calamine_value)
+    else:
+        workbook = openpyxl.load_workbook(file_name, read_only=True, data_only=True, keep_links=False)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header, data, last_filled = _collect_columns(rows, wanted)
+        finally:
+            workbook.close()
+
+    # Trailing empty rows are dropped, as pandas does
+    df = pd.DataFrame(data[:last_filled], columns=header)
+    return df.where(df.notna(), np.nan)
+
+
+def _calamine_value(value):
+    """Convert a calamine cell value the way pandas' calamine engine does: empty
+    cells are '' and numbers are floats, so these become None and whole ints"""
+    if value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _collect_columns(rows, wanted, empty=None, convert=None):
+    """Take the wanted columns from an iterator of sheet rows whose first row is the header.
+
+    empty is the value the reader gives for empty cells, and convert, if given,
+    is applied to the kept values. Returns the kept header names, the rows of
+    kept values, and the number of rows up to the last one with any value in it.
+    """
+    header = next(rows, ())
+    keep = [i for i, name in enumerate(header) if name in wanted]
+    data = []
+    last_filled = 0
+    for row in rows:
+        values = [row[i] if i < len(row) else empty for i in keep]
+        if convert is not None:
+            values = [convert(value) for value in values]
+        data.append(values)
+        if any(value != empty for value in row):
+            last_filled = len(data)
+    return [header[i] for i in keep], data, last_filled
+
+
+def save_dataframe(df, file_name):
+    """Save a DataFrame to an Excel file, or to a Parquet file if the name ends with .parquet"""
+    if file_name.lower().endswith('.parquet'):
+        df.to_parquet(file_name, index=False)
+    else:
+        with pd.ExcelWriter(file_name, engine=EXCEL_WRITER_ENGINE,
+                            engine_kwargs=EXCEL_WRITER_KWARGS) as writer:
+            df.to_excel(writer, index=False)
+
+
+def fit_line(x, y):
+    """Least squares fit of y = slope * x + intercept, returning (slope, intercept)"""
+    x_mean = x.mean()
+    y_mean = y.mean()
+    dx = x - x_mean
+    denominator = (dx * dx).sum()
+    if denominator == 0:
+        raise np.linalg.LinAlgError("all x values are equal")
+    slope = (dx * (y - y_mean)).sum() / denominator
+    return slope, y_mean - slope * x_mean
+
+
+def dataframe_to_rows(df, column_mapping):
+    """Build one dict per DataFrame row keyed by database field, with NaN stored as None.
+
+    Columns are converted as whole arrays, which is much faster than iterrows().
+    """
+    columns = {}
+    for excel_col, db_field in column_mapping.items():
+        if excel_col in df.columns:
+            values = df[excel_col].to_numpy(dtype=object, copy=True)
+            values[df[excel_col].isna().to_numpy()] = None
+            columns[db_field] = values.tolist()
+    fields = list(columns)
+    return [dict(zip(fields, values)) for values in zip(*columns.values())]
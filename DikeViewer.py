@@ -1,16 +1,19 @@
 import sys
 import os
+import math
+import numpy as np
 import pandas as pd
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QTableView, QLabel, QSplitter, 
                             QFileDialog, QPushButton, QMessageBox, QScrollArea, QSizePolicy, QCheckBox, QLayout, QLineEdit, QTableWidget, QTableWidgetItem,
-                            QHeaderView)
-from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QPoint, QEvent, QRect, pyqtSignal, QSortFilterProxyModel, QSize, QUrl, QObject, QTimer, QSettings
-from PyQt5.QtGui import QPixmap, QImage, QCursor, QPainter, QColor, QPen
+                            QHeaderView, QStyledItemDelegate, QStyleOptionViewItem)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QPoint, QEvent, QRect, pyqtSignal, QSortFilterProxyModel, QSize, QUrl, QObject, QTimer, QSettings, QRunnable, QThreadPool
+from PyQt5.QtGui import QPixmap, QPixmapCache, QImage, QCursor, QPainter, QColor, QPen
 from PyQt5.QtWebChannel import QWebChannel
 import json
 import csv
 import re
+from DikeUtils import read_excel_columns
 
 # Try to import WebEngine components, but continue even if they're not available
 try:
@@ -28,9 +31,58 @@ def debug_print(message, level=1):
     level 1: Normal debugging (function calls, basic operations)
     level 2: Verbose debugging (detailed operation info)
     """
-    if DikeViewerApp.DEBUG_MODE >= level:
+    if debug_enabled(level):
         print(message)
 
+def debug_enabled(level=1):
+    """Return True if messages of the given level are printed"""
+    return DikeViewerApp.DEBUG_MODE >= level
+
+# Number of table rows handed to the view at a time, more being fetched as it scrolls
+TABLE_FETCH_BATCH_SIZE = 500
+
+# Image coordinates in the table are in cm on a 96 DPI image (1 inch = 2.54 cm)
+PIXELS_PER_CM = 96 / 2.54
+
+# Memory for decoded images kept in QPixmapCache, in KB
+PIXMAP_CACHE_LIMIT_KB = 256 * 1024
+
+def pixmap_cache_key(image_path):
+    """Return the QPixmapCache key of an image file, or None if the file is missing.
+
+    The key includes the file's modification time, so an image that was
+    edited on disk is decoded again.
+    """
+    try:
+        return f"{image_path}|{os.path.getmtime(image_path)}"
+    except OSError:
+        return None
+
+def is_pixmap_cached(image_path):
+    """Return True if load_pixmap would find the image in QPixmapCache"""
+    key = pixmap_cache_key(image_path)
+    return key is not None and QPixmapCache.find(key) is not None
+
+def load_pixmap(image_path, image=None):
+    """Return the pixmap of an image file, keeping recently used images in QPixmapCache.
+
+    image is the file already decoded off the GUI thread, leaving only the
+    conversion to do; without it the file is decoded here.
+    """
+    key = pixmap_cache_key(image_path)
+    if key is None:
+        # Missing or unreadable file, which QPixmap would not load either
+        return QPixmap()
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None:
+        if image is not None:
+            pixmap = QPixmap.fromImage(image)
+        else:
+            pixmap = QPixmap(image_path)
+        if not pixmap.isNull():
+            QPixmapCache.insert(key, pixmap)
+    return pixmap
+
 class DikeTableModel(QAbstractTableModel):
     def __init__(self, data=None):
         super().__init__()
@@ -39,7 +91,7 @@ class DikeTableModel(QAbstractTableModel):
                         "거리 (km)", "주소", "색", "좌표 X", "좌표 Y", "사진 이름"]
         
         # Sample data - will be replaced with data from Excel
-        self.data = data or [
+        rows = data or [
             ["마전리", "ls", "연천층군 미산층", "석회암", "선캄브리아시대 원생누대", -10.8, 0.26, 
              "경기도 연천군 미산면 아미리 576-3", "하늘색", 30.62, 12.49, "0. 마전리"],
             ["마전리", "ls", "연천층군 미산층", "석회암", "선캄브리아시대 원생누대", -42.3, 0.18, 
@@ -53,66 +105,104 @@ class DikeTableModel(QAbstractTableModel):
             ["만대리", "Kad", "유문암, 규장암", "산성암맥 유문암, 규장암", "중생대 백악기", -68.9, 0.39, 
              "강원특별자치도 양구군 동면 팔랑리 산 10-4", "빨간색", 13.57, 14.05, "3. 만대리"]
         ]
+        # Column and order the rows were last sorted by, applied again to newly loaded data
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+        # Number of times data was loaded, so a load finishing late can tell it is outdated
+        self.load_count = 0
+        self.set_columns(pd.DataFrame(rows, columns=self.headers[1:], dtype=object))
     
-    def load_data_from_excel(self, excel_path):
-        """Load data from Excel file and update the model"""
-        try:
-            debug_print(f"Attempting to load Excel file: {excel_path}", 1)
-            
-            # Read Excel file
-            df = pd.read_excel(excel_path)
-            
-            # Remove any unnamed columns or columns we don't need
-            df = df[df.columns[~df.columns.str.contains('Unnamed')]]
-            
-            # Remove the '200 아래' column if it exists
-            if '200 아래' in df.columns:
-                df = df.drop(columns=['200 아래'])
-            
-            debug_print(f"Excel file loaded successfully", 1)
-            debug_print(f"DataFrame shape after cleanup: {df.shape}", 2)
-            debug_print(f"Columns after cleanup: {list(df.columns)}", 2)
+    def set_columns(self, df):
+        """Store the table data (without the sequence column) as one array per column"""
+        self.columns = [df[col].to_numpy(dtype=object) for col in self.headers[1:]]
+        self.row_count = len(df)
+        # Rows shown to the view so far; the rest are fetched as it scrolls
+        self.loaded_rows = min(TABLE_FETCH_BATCH_SIZE, self.row_count)
+        # Position of each row in the file; rows are reordered in place when sorted
+        self.load_order = np.arange(self.row_count)
+        # Text of the sequence numbers, shared with the proxy which numbers the visible rows
+        self.row_labels = [str(row) for row in range(1, self.row_count + 1)]
+        # Display text converted once here instead of on every paint, with missing values blank.
+        # Kept as plain lists, which data() indexes faster than numpy object arrays
+        self.display_columns = []
+        # Sort keys of a single type per column, so the proxy never compares text with
+        # numbers: numeric columns sort as floats, the rest as their text, and missing
+        # values are None, which Qt sorts after everything else
+        self.sort_columns = []
+        for col, values in zip(self.headers[1:], self.columns):
+            missing = df[col].isna().to_numpy()
+            text = np.array([str(value) for value in values], dtype=object)
+            text[missing] = ""
+            self.display_columns.append(text.tolist())
+            numbers = pd.to_numeric(df[col], errors='coerce')
+            if numbers.notna().sum() == len(df) - missing.sum():
+                keys = numbers.to_numpy(dtype=object)
+            else:
+                keys = text.copy()
+            keys[missing] = None
+            self.sort_columns.append(keys.tolist())
+        # Image coordinates parsed once as floats, for placing markers
+        self.x_coords = pd.to_numeric(df["좌표 X"], errors='coerce').to_numpy(dtype=float)
+        self.y_coords = pd.to_numeric(df["좌표 Y"], errors='coerce').to_numpy(dtype=float)
+        # Marker positions in image pixels, converted once for all rows
+        self.has_coords = ~(np.isnan(self.x_coords) | np.isnan(self.y_coords))
+        self.x_pixels = np.where(self.has_coords, np.trunc(self.x_coords * PIXELS_PER_CM), 0).astype(np.int32)
+        self.y_pixels = np.where(self.has_coords, np.trunc(self.y_coords * PIXELS_PER_CM), 0).astype(np.int32)
+        # Distinct non-empty photo names in file order
+        self.photo_names = [name for name in dict.fromkeys(self.columns[11]) if isinstance(name, str) and name]
+    
+    def sorted_rows(self, column, order):
+        """Return the rows in the given sort order, with equal values left in their current order"""
+        if column == 0:
+            ranks = self.load_order
+        else:
+            # Rank the sort keys, with missing values after every other value
+            keys = np.array(self.sort_columns[column - 1], dtype=object)
+            missing = np.equal(keys, None)
+            ranks = np.zeros(self.row_count, dtype=np.int64)
+            if not missing.all():
+                _, present_ranks = np.unique(keys[~missing], return_inverse=True)
+                ranks[~missing] = present_ranks
+                ranks[missing] = present_ranks.max() + 1
+        if order == Qt.DescendingOrder:
+            ranks = -ranks
+        # A stable sort, so sorting by one column and then another orders by both
+        return np.argsort(ranks, kind='stable')
+    
+    def reorder_rows(self, rows):
+        """Put the rows of every column in the given order"""
+        self.columns = [values[rows] for values in self.columns]
+        self.display_columns = [[text[row] for row in rows.tolist()] for text in self.display_columns]
+        self.sort_columns = [[keys[row] for row in rows.tolist()] for keys in self.sort_columns]
+        for name in ("load_order", "x_coords", "y_coords", "has_coords", "x_pixels", "y_pixels"):
+            setattr(self, name, getattr(self, name)[rows])
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort the rows by a column with numpy, instead of one Python call per comparison"""
+        self.sort_column = column
+        self.sort_order = order
+        # A selected row can move anywhere, so every row is shown to the view first
+        self.fetch_rows(self.row_count)
+        self.layoutAboutToBeChanged.emit()
+        rows = self.sorted_rows(column, order)
+        self.reorder_rows(rows)
+        # Move the persistent indexes (the view's selection and current cell) along with their rows
+        new_rows = np.empty_like(rows)
+        new_rows[rows] = np.arange(self.row_count)
+        old_indexes = self.persistentIndexList()
+        self.changePersistentIndexList(
+            old_indexes, [self.index(int(new_rows[index.row()]), index.column()) for index in old_indexes])
+        self.layoutChanged.emit()
+    
+    def load_data_from_excel(self, excel_path, use_cache=False):
+        """Load data from Excel file and update the model
 
-            # Check if necessary columns exist
-            # Skip the first column (sequence number) as it's generated
-            required_columns = self.headers[1:]
-            
-            # Check which columns actually exist
-            existing_columns = []
-            missing_columns = []
-            for col in required_columns:
-                if col in df.columns:
-                    existing_columns.append(col)
-                else:
-                    missing_columns.append(col)
-            
-            debug_print(f"Found columns: {existing_columns}", 2)
-            debug_print(f"Missing columns: {missing_columns}", 2)
-            
-            if missing_columns:
-                debug_print(f"Warning: Missing columns in Excel file: {missing_columns}", 1)
-                debug_print("Will use empty values for missing columns", 1)
-                
-            # Convert DataFrame to list of lists (only keeping required columns that exist)
-            data_list = []
-            for _, row in df.iterrows():
-                data_row = []
-                for col in required_columns:
-                    if col in df.columns:
-                        data_row.append(row[col])
-                    else:
-                        # Add empty value for missing columns
-                        data_row.append("")
-                data_list.append(data_row)
-                debug_print(f"Data row: {data_row}", 2)
-            
-            # Update model data
-            debug_print(f"Updating model with {len(data_list)} rows of data", 1)
-            self.beginResetModel()
-            self.data = data_list
-            self.endResetModel()
-            
-            debug_print(f"Successfully loaded {len(data_list)} rows from Excel file", 1)
+        With use_cache, the parsed columns are kept in a Parquet file next to the
+        workbook and reused as long as the workbook's modification time and size
+        are unchanged.
+        """
+        try:
+            self.set_dataframe(self.read_excel_table(excel_path, use_cache))
             return True
             
         except Exception as e:
@@ -121,8 +211,106 @@ class DikeTableModel(QAbstractTableModel):
             traceback.print_exc()
             return False
     
-    def rowCount(self, parent=None):
-        return len(self.data)
+    def read_excel_table(self, excel_path, use_cache=False):
+        """Read the table columns of an Excel file into a DataFrame in table order.
+
+        The model itself is not changed, so this can run in a worker thread.
+        """
+        debug_print(f"Attempting to load Excel file: {excel_path}", 1)
+        
+        # Skip the first column (sequence number) as it's generated
+        required_columns = self.headers[1:]
+        
+        # The cache holds data only: the columns in Parquet, and the workbook's
+        # (mtime, size) they were read from in a JSON key file
+        cache_path = excel_path + ".cache.parquet"
+        key_path = excel_path + ".cache.json"
+        df = None
+        if use_cache:
+            stat = os.stat(excel_path)
+            cache_key = [stat.st_mtime, stat.st_size]
+            if os.path.exists(key_path) and os.path.exists(cache_path):
+                try:
+                    with open(key_path, encoding='utf-8') as f:
+                        cached_key = json.load(f)
+                    if cached_key == cache_key:
+                        df = pd.read_parquet(cache_path)
+                        # Missing values come back as None; make them NaN as the reader does
+                        df = df.where(df.notna(), np.nan)
+                        debug_print(f"Loaded cached data: {cache_path}", 1)
+                except Exception as e:
+                    debug_print(f"Could not read cache {cache_path}: {e}", 1)
+        
+        if df is None:
+            # Read only the columns shown in the table, so unnamed and unused
+            # columns (like '200 아래') are skipped while parsing
+            df = read_excel_columns(excel_path, required_columns)
+            if use_cache:
+                try:
+                    # The key is written last, so it never vouches for a half-written cache
+                    if os.path.exists(key_path):
+                        os.remove(key_path)
+                    df.to_parquet(cache_path, index=False)
+                    with open(key_path, 'w', encoding='utf-8') as f:
+                        json.dump(cache_key, f)
+                except Exception as e:
+                    # No Parquet engine installed, columns mixing text and numbers,
+                    # or a read-only data directory
+                    debug_print(f"Could not write cache {cache_path}: {e}", 1)
+        
+        debug_print(f"Excel file loaded successfully", 1)
+        debug_print(f"DataFrame shape: {df.shape}", 2)
+        debug_print(f"Columns: {list(df.columns)}", 2)
+
+        # Check which of the necessary columns actually exist
+        df_columns = set(df.columns)
+        existing_columns = [col for col in required_columns if col in df_columns]
+        missing_columns = [col for col in required_columns if col not in df_columns]
+        
+        debug_print(f"Found columns: {existing_columns}", 2)
+        debug_print(f"Missing columns: {missing_columns}", 2)
+        
+        if missing_columns:
+            debug_print(f"Warning: Missing columns in Excel file: {missing_columns}", 1)
+            debug_print("Will use empty values for missing columns", 1)
+        
+        # Put the columns in table order, with empty values for missing columns
+        df = df.reindex(columns=required_columns, fill_value="")
+        if len(df) and debug_enabled(2):
+            # Building a row Series is only worth it when the trace is shown
+            debug_print(f"First data row: {df.iloc[0].tolist()}", 2)
+        return df
+    
+    def set_dataframe(self, df):
+        """Replace the model data with a DataFrame returned by read_excel_table"""
+        debug_print(f"Updating model with {len(df)} rows of data", 1)
+        self.beginResetModel()
+        self.set_columns(df)
+        if self.sort_column is not None:
+            self.reorder_rows(self.sorted_rows(self.sort_column, self.sort_order))
+        self.endResetModel()
+        self.load_count += 1
+        
+        debug_print(f"Successfully loaded {len(df)} rows from Excel file", 1)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded_rows
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded_rows < self.row_count
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if not parent.isValid():
+            self.fetch_rows(self.loaded_rows + TABLE_FETCH_BATCH_SIZE)
+    
+    def fetch_rows(self, stop):
+        """Show the rows up to (not including) stop to the view, if not shown yet"""
+        stop = min(stop, self.row_count)
+        if stop <= self.loaded_rows:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded_rows, stop - 1)
+        self.loaded_rows = stop
+        self.endInsertRows()
     
     def columnCount(self, parent=None):
         return len(self.headers)
@@ -131,17 +319,17 @@ class DikeTableModel(QAbstractTableModel):
         if index.column() == 0:  # Sequence number column
             if role == Qt.DisplayRole:
                 # Return as string for display
-                return str(index.row() + 1)
+                return self.row_labels[index.row()]
             elif role == Qt.UserRole:
                 # Return as integer for sorting
                 return index.row() + 1
         else:
             if role == Qt.DisplayRole:
                 # For all other columns, return data from the model
-                return str(self.data[index.row()][index.column() - 1])
+                return self.display_columns[index.column() - 1][index.row()]
             elif role == Qt.UserRole:
-                # For other columns, provide the same data for sorting
-                return self.data[index.row()][index.column() - 1]
+                # For other columns, provide the precomputed sort key
+                return self.sort_columns[index.column() - 1][index.row()]
         return None
     
     def headerData(self, section, orientation, role=Qt.DisplayRole):
@@ -151,12 +339,92 @@ class DikeTableModel(QAbstractTableModel):
     
     def get_photo_name(self, row):
         """Return the photo name for the given row"""
-        if 0 <= row < len(self.data):
-            return self.data[row][11]  # Still index 11 in the data array (12th column in display)
+        if 0 <= row < self.row_count:
+            return self.columns[11][row]  # Still index 11 in the data columns (12th column in display)
         return None
+    
+    def get_photo_rows(self, photo_name):
+        """Return the rows with the given photo name, in file order"""
+        rows = np.flatnonzero(self.columns[11] == photo_name)
+        return rows[np.argsort(self.load_order[rows])].tolist()
+    
+    def get_photo_markers(self, photo_name):
+        """Return the rows with the given photo name that have image coordinates, in file
+        order, with their marker positions in image pixels as arrays, and the rows without"""
+        rows = np.array(self.get_photo_rows(photo_name), dtype=np.intp)
+        present = self.has_coords[rows]
+        rows_with_coords = rows[present]
+        return (rows_with_coords, self.x_pixels[rows_with_coords], self.y_pixels[rows_with_coords],
+                rows[~present])
+    
+    def get_photo_names(self):
+        """Return the distinct non-empty photo names in file order"""
+        return self.photo_names
+    
+    def get_coordinates(self, row):
+        """Return the (x, y) image coordinates of the given row as floats"""
+        if not self.has_coords[row]:
+            raise ValueError(f"No image coordinates in row {row}")
+        return float(self.x_coords[row]), float(self.y_coords[row])
+    
+    def get_pixel_coordinates(self, row):
+        """Return the (x, y) marker position of the given row in image pixels"""
+        if not self.has_coords[row]:
+            raise ValueError(f"No image coordinates in row {row}")
+        return int(self.x_pixels[row]), int(self.y_pixels[row])
+
+
+class ImageLoaderSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+
+class ImageLoader(QRunnable):
+    """Decode an image file in a worker thread and hand the QImage back through a signal"""
+    def __init__(self, image_path):
+        super().__init__()
+        self.image_path = image_path
+        self.signals = ImageLoaderSignals()
+    
+    def run(self):
+        # A null image tells the receiver that the file could not be decoded
+        image = QImage(self.image_path)
+        try:
+            self.signals.loaded.emit(self.image_path, image)
+        except RuntimeError:
+            # The viewer was closed before the image was decoded
+            pass
+
+
+class TableLoaderSignals(QObject):
+    loaded = pyqtSignal(str, object)
+
+
+class TableLoader(QRunnable):
+    """Read an Excel file for the table model in a worker thread and hand the DataFrame
+    back through a signal, or None if it could not be read"""
+    def __init__(self, model, excel_path):
+        super().__init__()
+        self.model = model
+        self.excel_path = excel_path
+        self.signals = TableLoaderSignals()
+    
+    def run(self):
+        try:
+            df = self.model.read_excel_table(self.excel_path, use_cache=True)
+        except Exception as e:
+            debug_print(f"Error loading Excel file: {e}", 0)
+            df = None
+        try:
+            self.signals.loaded.emit(self.excel_path, df)
+        except RuntimeError:
+            # The window was closed before the file was read
+            pass
 
 
 class ImageViewer(QWidget):
+    # Emitted with the path of an image selected by set_image_by_name once it is shown
+    image_loaded = pyqtSignal(str)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
@@ -197,11 +465,13 @@ class ImageViewer(QWidget):
         self.filename_label = QLabel("No image loaded")
         self.filename_label.setAlignment(Qt.AlignCenter)
         self.filename_label.setStyleSheet("font-weight: bold; font-size: 11px;")
-        # Set size policy to allow the label to shrink
-        self.filename_label.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Preferred)
-        # Enable text elision for long filenames
+        # The label takes the width left by the buttons whatever its text, so a new
+        # filename doesn't change the layout; the text is elided to fit in instead
+        self.filename_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Preferred)
         self.filename_label.setTextFormat(Qt.PlainText)
         self.filename_label.setWordWrap(False)
+        # Full text of the filename label, before eliding
+        self.filename_text = "No image loaded"
         
         # Add widgets to top layout
         top_layout.addWidget(self.zoom_out_button)
@@ -223,6 +493,34 @@ class ImageViewer(QWidget):
         # Initialize variables for zooming and panning
         self.image_dir = ""
         self.current_image_path = None
+        # (filename, path) of each image in image_dir, the same by file name without
+        # extension, and the image found for each photo name
+        self.image_files = []
+        self.image_stems = {}
+        self.image_lookup = {}
+        # Images still being decoded in the background. The loaders get their own
+        # pool: Qt's smooth scaling waits on the global pool while holding the GIL,
+        # which a Python runnable queued there would need to finish
+        self.pending_images = set()
+        self.loader_pool = QThreadPool(self)
+        self.loader_pool.setMaxThreadCount(2)
+        QPixmapCache.setCacheLimit(PIXMAP_CACHE_LIMIT_KB)
+    
+    def set_filename_text(self, text):
+        """Show text in the filename label, elided in the middle if it is too long"""
+        self.filename_text = text
+        self.update_filename_label()
+    
+    def update_filename_label(self):
+        """Elide the filename text to the current width of the label"""
+        self.filename_label.ensurePolished()
+        metrics = self.filename_label.fontMetrics()
+        self.filename_label.setText(metrics.elidedText(
+            self.filename_text, Qt.ElideMiddle, max(20, self.filename_label.width() - 4)))
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_filename_label()
     
     def update_zoom_level(self, scale_factor):
         """Update the zoom level display"""
@@ -296,74 +594,108 @@ class ImageViewer(QWidget):
         self.image_display.fit_to_window()
         
     def set_image_dir(self, directory):
-        """Set the directory where images are stored"""
+        """Set the directory where images are stored and index its image files"""
         self.image_dir = directory
+        self.image_lookup = {}
+        QPixmapCache.clear()
+        if directory and os.path.exists(directory):
+            with os.scandir(directory) as entries:
+                self.image_files = [
+                    (entry.name, entry.path)
+                    for entry in entries
+                    if entry.name.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')) and entry.is_file()
+                ]
+        else:
+            self.image_files = []
+        # Files named exactly after a photo name (without extension), looked up first
+        self.image_stems = {}
+        for filename, path in self.image_files:
+            self.image_stems.setdefault(os.path.splitext(filename)[0], path)
         
     def find_image_file(self, photo_name):
         """Find an image file containing the photo_name in its filename"""
-        if not self.image_dir or not os.path.exists(self.image_dir):
-            return None
-            
-        for filename in os.listdir(self.image_dir):
-            if photo_name in filename and filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-                return os.path.join(self.image_dir, filename)
-        
-        return None
+        if photo_name not in self.image_lookup:
+            path = self.image_stems.get(photo_name)
+            if path is None:
+                path = next((path for filename, path in self.image_files if photo_name in filename), None)
+            self.image_lookup[photo_name] = path
+        return self.image_lookup[photo_name]
         
     def set_image_by_name(self, photo_name):
-        """Find and set an image that contains the photo_name in its filename"""
+        """Find an image that contains the photo_name in its filename and start showing it.
+
+        An image that is not displayed or cached yet is decoded in the background and
+        shown when it is ready, emitting image_loaded. Returns False if no image is found.
+        """
         if not photo_name:
             return False
             
         image_path = self.find_image_file(photo_name)
-        if image_path:
-            success = self.set_image(image_path)
-            return success
-        else:
+        if not image_path:
             debug_print(f"No image found for: {photo_name}", 1)
             return False
+        if not os.path.exists(image_path):
+            debug_print(f"Image file not found: {image_path}", 0)
+            return False
+        
+        self.current_image_path = image_path
+        if ((image_path == self.image_display.image_path and self.image_display.original_pixmap)
+                or is_pixmap_cached(os.path.abspath(image_path))):
+            # Nothing to decode, show it right away
+            if self.set_image(image_path):
+                self.image_loaded.emit(image_path)
+        elif image_path not in self.pending_images:
+            self.pending_images.add(image_path)
+            loader = ImageLoader(image_path)
+            loader.signals.loaded.connect(self.on_image_decoded)
+            self.loader_pool.start(loader)
+        return True
+    
+    def on_image_decoded(self, image_path, image):
+        """Show an image decoded in the background, unless another image was selected meanwhile"""
+        self.pending_images.discard(image_path)
+        if image_path != self.current_image_path or image_path == self.image_display.image_path:
+            # Stale, or set_image showed the image meanwhile
+            return
+        if self.set_image(image_path, image):
+            self.image_loaded.emit(image_path)
         
-    def set_image(self, image_path):
-        """Load and display an image from the given path"""
+    def set_image(self, image_path, image=None):
+        """Load and display an image from the given path, or from image if it is already decoded"""
         if not os.path.exists(image_path):
             debug_print(f"Image file not found: {image_path}", 0)
             return False
         
         self.current_image_path = image_path
-        success = self.image_display.load_image(image_path)
+        success = self.image_display.load_image(image_path, image)
         
         if success:
             # Update filename label with ellipsis for long names
             filename = os.path.basename(image_path)
-            self.filename_label.setText(filename)
-            # Ensure the label shows ellipsis for long text
+            self.set_filename_text(filename)
             self.filename_label.setToolTip(filename)  # Show full name on hover
             return True
         else:
             debug_print(f"Failed to load image: {image_path}", 0)
-            self.filename_label.setText("Failed to load image")
+            self.set_filename_text("Failed to load image")
             self.filename_label.setToolTip("")
             return False
 
     def set_marker(self, x, y):
-        """Set a marker at the specified coordinates and update the display"""
-        # Check if coordinates are floats (centimeters) or integers (pixels)
+        """Set a marker at the specified coordinates: floats are centimeters, integers pixels"""
         if isinstance(x, float) or isinstance(y, float):
-            # Convert from centimeters to pixels (assuming 96 DPI)
-            # 1 inch = 2.54 cm, and 96 pixels = 1 inch
-            # So 1 cm = 96/2.54 ≈ 37.8 pixels
-            pixels_per_cm = 96 / 2.54
-            x_pixels = x * pixels_per_cm
-            y_pixels = y * pixels_per_cm
-            debug_print(f"Converting coordinates from cm to pixels: ({x},{y}) cm -> ({x_pixels},{y_pixels}) px", 2)
+            self.set_marker_cm(x, y)
         else:
-            # Already in pixels
-            x_pixels = x
-            y_pixels = y
-            
-        # Set marker on display widget (without centering)
-        self.image_display.set_marker(int(x_pixels), int(y_pixels))
+            self.set_marker_px(x, y)
+    
+    def set_marker_cm(self, x, y):
+        """Set a marker at image coordinates in centimeters (96 DPI)"""
+        self.set_marker_px(int(x * PIXELS_PER_CM), int(y * PIXELS_PER_CM))
+    
+    def set_marker_px(self, x, y):
+        """Set a marker at the given image pixel position, without unit conversion"""
         # Don't automatically center - we'll do that explicitly after zoom
+        self.image_display.set_marker(int(x), int(y))
     
     def clear_marker(self):
         """Clear the marker"""
@@ -383,13 +715,11 @@ class ImageViewer(QWidget):
         marker_numbers = []
         primary_number = None
         
-        pixels_per_cm = 96 / 2.54  # Convert cm to pixels
-        
         for i, (x, y) in enumerate(coordinates_list):
             # Convert to pixels if needed
             if isinstance(x, float) or isinstance(y, float):
-                x_pixels = x * pixels_per_cm
-                y_pixels = y * pixels_per_cm
+                x_pixels = x * PIXELS_PER_CM
+                y_pixels = y * PIXELS_PER_CM
             else:
                 x_pixels = x
                 y_pixels = y
@@ -420,16 +750,47 @@ class ImageDisplayWidget(QWidget):
         # Set focus policy to receive keyboard events
         self.setFocusPolicy(Qt.StrongFocus)
         self.setMouseTracking(True)
+        # paintEvent fills every pixel, so Qt needn't clear the background first
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
         
         # Variables for image display
+        self.image_path = None
         self.original_pixmap = None
+        # Scaled copy of original_pixmap for displayed_scale, reused between repaints
         self.displayed_pixmap = None
+        self.displayed_scale = None
+        self.displayed_smooth = False
+        # Smoothly scaled copies at zoomed-out levels (scale -> pixmap), so going back to
+        # fit or 100% reuses them. Larger scales aren't kept, they can be very big
+        self.scaled_pixmaps = {}
+        self.max_scaled_pixmaps = 4
+        # When the scaled image would be more than twice the viewport, scale only the region
+        # around the viewport (tile_pixmap, placed at tile_rect in the scaled image) instead
+        # of the whole image, which can take hundreds of MB for large photos or high zoom
+        self.low_memory = True
+        self.tile_pixmap = None
+        self.tile_rect = QRect()
+        self.tile_scale = None
+        self.tile_smooth = False
+        # Copies of original_pixmap halved in size level by level (level 0 is the original),
+        # so a zoomed-out view is scaled from a small copy instead of the full image. Levels
+        # are made the first time a zoom needs them, not all when an image is loaded
+        self.pyramid = []
+        self.min_pyramid_size = 512
+        # While the wheel is turning the image is rescaled with the fast filter,
+        # and once it has been still for a moment it is redrawn smoothly
+        self.smooth_timer = QTimer(self)
+        self.smooth_timer.setSingleShot(True)
+        self.smooth_timer.setInterval(150)
+        self.smooth_timer.timeout.connect(self.update)
         
         # Variables for zooming
         self.scale_factor = 1.0
         self.min_scale = 0.1
         self.max_scale = 10.0
         self.base_zoom_step = 0.1  # Base zoom step at 100%
+        # Wheel rotation (in eighths of a degree) not yet turned into a zoom step
+        self.pending_wheel_delta = 0
         
         # Variables for panning
         self.panning = False
@@ -464,13 +825,21 @@ class ImageDisplayWidget(QWidget):
                 # Low zoom levels
                 return self.base_zoom_step
         
-    def load_image(self, image_path):
-        """Load an image from file"""
-        pixmap = QPixmap(image_path)
-        if pixmap.isNull():
-            return False
+    def load_image(self, image_path, image=None):
+        """Load an image from file, or from image if it was already decoded off the GUI thread"""
+        # Reselecting the current image only resets the view, without decoding the file again
+        if image_path != self.image_path or self.original_pixmap is None:
+            pixmap = load_pixmap(os.path.abspath(image_path), image)
+            if pixmap.isNull():
+                return False
             
-        self.original_pixmap = pixmap
+            self.image_path = image_path
+            self.original_pixmap = pixmap
+            self.displayed_pixmap = None
+            self.scaled_pixmaps = {}
+            self.tile_pixmap = None
+            self.pyramid = [pixmap]
+
         self.scale_factor = 1.0
         self.offset = QPoint(0, 0)
         self.marker_position = None
@@ -479,6 +848,82 @@ class ImageDisplayWidget(QWidget):
         self.update()
         return True
         
+    def pyramid_level(self):
+        """Return the smallest pyramid level that still has all the detail shown at the
+        current zoom, and its size relative to the original image"""
+        index = 0
+        if self.scale_factor < 1.0:
+            index = int(-math.log2(self.scale_factor))
+            # Halve the smallest level so far until the zoom's level exists, stopping at
+            # about min_pyramid_size pixels across
+            while len(self.pyramid) <= index:
+                level = self.pyramid[-1]
+                if level.width() <= self.min_pyramid_size or level.height() <= self.min_pyramid_size:
+                    break
+                self.pyramid.append(level.scaled(level.width() // 2, level.height() // 2,
+                                                 Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+            index = min(index, len(self.pyramid) - 1)
+        source = self.pyramid[index]
+        return source, source.width() / self.original_pixmap.width()
+    
+    def scaled_image(self, smooth):
+        """Return the whole image scaled to the current zoom"""
+        # Rescale only when the zoom changed, not on every repaint (panning, markers)
+        if (self.displayed_pixmap is None or self.displayed_scale != self.scale_factor
+                or (smooth and not self.displayed_smooth)):
+            cached = self.scaled_pixmaps.get(self.scale_factor) if smooth else None
+            if cached is not None:
+                self.displayed_pixmap = cached
+            else:
+                scaled_size = self.original_pixmap.size() * self.scale_factor
+                source, _ = self.pyramid_level()
+                self.displayed_pixmap = source.scaled(
+                    scaled_size.width(),
+                    scaled_size.height(),
+                    Qt.KeepAspectRatio,
+                    Qt.SmoothTransformation if smooth else Qt.FastTransformation
+                )
+                if smooth and self.scale_factor <= 1.0:
+                    self.scaled_pixmaps[self.scale_factor] = self.displayed_pixmap
+                    if len(self.scaled_pixmaps) > self.max_scaled_pixmaps:
+                        # Drop the oldest level
+                        del self.scaled_pixmaps[next(iter(self.scaled_pixmaps))]
+            self.displayed_scale = self.scale_factor
+            self.displayed_smooth = smooth
+        return self.displayed_pixmap
+    
+    def visible_tile(self, x, y, scaled_size, smooth):
+        """Return the scaled part of the image around the viewport, with the image drawn
+        at (x, y); tile_rect is its position within the whole scaled image"""
+        image_rect = QRect(QPoint(0, 0), scaled_size)
+        visible = QRect(-x, -y, self.width(), self.height()).intersected(image_rect)
+        if visible.isEmpty():
+            return None
+        
+        if (self.tile_pixmap is None or self.tile_scale != self.scale_factor
+                or (smooth and not self.tile_smooth) or not self.tile_rect.contains(visible)):
+            # Cover half a viewport more on each side, so panning a little reuses the tile
+            wanted = visible.adjusted(-self.width() // 2, -self.height() // 2,
+                                      self.width() // 2, self.height() // 2).intersected(image_rect)
+            # Cut the region out of the pyramid level for this zoom, in that level's pixels
+            source, ratio = self.pyramid_level()
+            scale = self.scale_factor / ratio
+            left = int(wanted.left() / scale)
+            top = int(wanted.top() / scale)
+            right = min(math.ceil((wanted.right() + 1) / scale), source.width())
+            bottom = min(math.ceil((wanted.bottom() + 1) / scale), source.height())
+            self.tile_rect = QRect(round(left * scale), round(top * scale),
+                                   round(right * scale) - round(left * scale),
+                                   round(bottom * scale) - round(top * scale))
+            self.tile_pixmap = source.copy(left, top, right - left, bottom - top).scaled(
+                self.tile_rect.size(),
+                Qt.IgnoreAspectRatio,
+                Qt.SmoothTransformation if smooth else Qt.FastTransformation
+            )
+            self.tile_scale = self.scale_factor
+            self.tile_smooth = smooth
+        return self.tile_pixmap
+    
     def paintEvent(self, event):
         """Draw the image with current zoom and pan settings"""
         painter = QPainter(self)
@@ -489,21 +934,26 @@ class ImageDisplayWidget(QWidget):
         painter.fillRect(self.rect(), self.placeholder_color)
         
         if self.original_pixmap:
-            # Calculate scaled image size
+            smooth = not self.smooth_timer.isActive()
             scaled_size = self.original_pixmap.size() * self.scale_factor
-            scaled_pixmap = self.original_pixmap.scaled(
-                scaled_size.width(),
-                scaled_size.height(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            
-            # Calculate position to center the image in the viewport and apply offset
-            x = (self.width() - scaled_pixmap.width()) // 2 + self.offset.x()
-            y = (self.height() - scaled_pixmap.height()) // 2 + self.offset.y()
-            
-            # Draw the scaled image at the offset position
-            painter.drawPixmap(x, y, scaled_pixmap)
+            if self.low_memory and (scaled_size.width() > 2 * self.width()
+                                    or scaled_size.height() > 2 * self.height()):
+                # Scaled image much larger than the viewport: only the part of the
+                # image around the viewport is scaled
+                x = (self.width() - scaled_size.width()) // 2 + self.offset.x()
+                y = (self.height() - scaled_size.height()) // 2 + self.offset.y()
+                tile_pixmap = self.visible_tile(x, y, scaled_size, smooth)
+                if tile_pixmap is not None:
+                    painter.drawPixmap(x + self.tile_rect.left(), y + self.tile_rect.top(), tile_pixmap)
+            else:
+                scaled_pixmap = self.scaled_image(smooth)
+                
+                # Calculate position to center the image in the viewport and apply offset
+                x = (self.width() - scaled_pixmap.width()) // 2 + self.offset.x()
+                y = (self.height() - scaled_pixmap.height()) // 2 + self.offset.y()
+                
+                # Draw the scaled image at the offset position
+                painter.drawPixmap(x, y, scaled_pixmap)
             
             # Draw secondary markers first (smaller and dimmer)
             if hasattr(self, 'secondary_markers') and self.secondary_markers:
@@ -513,15 +963,19 @@ class ImageDisplayWidget(QWidget):
                 painter.setPen(QPen(Qt.white, 2))
                 painter.setBrush(secondary_color)
                 
+                # Radius and number font are the same for every secondary marker
+                scaled_radius = int(self.marker_radius * 0.6 * self.scale_factor)
+                font = painter.font()
+                font.setBold(True)
+                font.setPointSize(max(8, int(9 * self.scale_factor)))
+                painter.setFont(font)
+                
                 for i, marker_pos in enumerate(self.secondary_markers):
                     if marker_pos:
                         # Calculate marker position with zoom and pan
                         marker_x = x + int(marker_pos.x() * self.scale_factor)
                         marker_y = y + int(marker_pos.y() * self.scale_factor)
                         
-                        # Use a smaller radius for secondary markers
-                        scaled_radius = int(self.marker_radius * 0.6 * self.scale_factor)
-                        
                         # Draw smaller marker
                         painter.drawEllipse(
                             QPoint(marker_x, marker_y),
@@ -531,14 +985,6 @@ class ImageDisplayWidget(QWidget):
                         
                         # Draw sequence number on marker if available
                         if hasattr(self, 'marker_numbers') and i < len(self.marker_numbers):
-                            painter.setPen(QPen(Qt.white, 2))
-                            # Set font for number
-                            font = painter.font()
-                            font.setBold(True)
-                            scaled_font_size = max(8, int(9 * self.scale_factor))
-                            font.setPointSize(scaled_font_size)
-                            painter.setFont(font)
-                            
                             # Draw number centered in marker
                             text_rect = QRect(
                                 marker_x - scaled_radius, 
@@ -591,9 +1037,13 @@ class ImageDisplayWidget(QWidget):
         # Get mouse position
         mouse_pos = event.pos()
         
-        # Calculate zoom change
-        degrees = event.angleDelta().y() / 8
-        steps = degrees / 15
+        # Touchpads and high-resolution wheels send many small deltas; collect them
+        # and zoom one step per full notch (15 degrees) instead of one per event
+        self.pending_wheel_delta += event.angleDelta().y()
+        if abs(self.pending_wheel_delta) < 120:
+            return
+        steps = self.pending_wheel_delta / 120
+        self.pending_wheel_delta = 0
         
         old_scale = self.scale_factor
         
@@ -645,7 +1095,8 @@ class ImageDisplayWidget(QWidget):
             # Emit signal for zoom change
             self.zoom_changed.emit(self.scale_factor)
             
-            # Redraw
+            # Redraw with the fast filter until the wheel settles
+            self.smooth_timer.start()
             self.update()
             
     def mousePressEvent(self, event):
@@ -665,8 +1116,9 @@ class ImageDisplayWidget(QWidget):
             # Update offset
             self.offset += delta
             
-            # Redraw
-            self.update()
+            # Move what is already drawn and repaint only the strips uncovered by the
+            # move, instead of redrawing the whole viewport for every mouse move
+            self.scroll(delta.x(), delta.y())
         else:
             # Change cursor when not panning
             if self.original_pixmap:
@@ -677,6 +1129,8 @@ class ImageDisplayWidget(QWidget):
         if event.button() == Qt.LeftButton and self.panning:
             self.panning = False
             self.setCursor(QCursor(Qt.OpenHandCursor))
+            # Redraw everything once, in case strips were painted from different tiles
+            self.update()
             
     def zoom_in(self):
         """Zoom in by one step"""
@@ -738,9 +1192,9 @@ class ImageDisplayWidget(QWidget):
         
     def set_marker(self, x, y):
         """Set marker at specified coordinates"""
-        debug_print(f"Setting marker at pixel coordinates: ({x}, {y})", 2)
         self.marker_position = QPoint(x, y)
-        debug_print(f"Marker position set to: {self.marker_position}", 2)
+        if debug_enabled(2):
+            debug_print(f"Marker position set to: {self.marker_position}", 2)
         # Don't center here - we'll do that explicitly
         self.update()
     
@@ -758,49 +1212,32 @@ class ImageDisplayWidget(QWidget):
             debug_print("Cannot center: marker or image not available", 1)
             return
         
-        # Log initial state
-        debug_print(f"Centering on marker: position={self.marker_position}, current offset={self.offset}", 2)
+        old_offset = QPoint(self.offset)
         
         # Calculate offset to center the marker
         center_x = self.width() // 2
         center_y = self.height() // 2
-        debug_print(f"Widget center: ({center_x}, {center_y})", 2)
-        
-        # Get image dimensions
-        img_width = self.original_pixmap.width()
-        img_height = self.original_pixmap.height()
-        debug_print(f"Original image dimensions: {img_width}x{img_height}", 2)
         
         # Calculate the scaled image dimensions and position
-        scaled_width = int(img_width * self.scale_factor)
-        scaled_height = int(img_height * self.scale_factor)
-        debug_print(f"Scaled image dimensions: {scaled_width}x{scaled_height}", 2)
+        scaled_width = int(self.original_pixmap.width() * self.scale_factor)
+        scaled_height = int(self.original_pixmap.height() * self.scale_factor)
         
         # Calculate image position before offset
         img_x = (self.width() - scaled_width) // 2
         img_y = (self.height() - scaled_height) // 2
-        debug_print(f"Image position before offset: ({img_x}, {img_y})", 2)
         
         # Calculate the marker position relative to the viewport
         marker_viewport_x = img_x + int(self.marker_position.x() * self.scale_factor)
         marker_viewport_y = img_y + int(self.marker_position.y() * self.scale_factor)
-        debug_print(f"Marker viewport position: ({marker_viewport_x}, {marker_viewport_y})", 2)
         
-        # Calculate new offset to center marker in viewport
-        new_offset_x = center_x - marker_viewport_x
-        new_offset_y = center_y - marker_viewport_y
-        debug_print(f"New calculated offset: ({new_offset_x}, {new_offset_y})", 2)
-        
-        # Apply the offset
-        self.offset.setX(new_offset_x)
-        self.offset.setY(new_offset_y)
-        debug_print(f"Offset updated to: {self.offset}", 2)
+        # Apply the offset that centers the marker in the viewport
+        self.offset.setX(center_x - marker_viewport_x)
+        self.offset.setY(center_y - marker_viewport_y)
         
         # Additional check to ensure marker is visible in viewport
         # Calculate where the marker will be after applying the offset
         final_marker_x = marker_viewport_x + self.offset.x()
         final_marker_y = marker_viewport_y + self.offset.y()
-        debug_print(f"Final marker position in viewport: ({final_marker_x}, {final_marker_y})", 2)
         
         # Define visible area margins (add some padding)
         margin = 50
@@ -808,29 +1245,27 @@ class ImageDisplayWidget(QWidget):
         visible_right = self.width() - margin
         visible_top = margin
         visible_bottom = self.height() - margin
-        debug_print(f"Visible area: left={visible_left}, right={visible_right}, top={visible_top}, bottom={visible_bottom}", 2)
         
         # Adjust offset if marker is outside visible area
         if final_marker_x < visible_left:
             self.offset.setX(self.offset.x() + (visible_left - final_marker_x))
-            debug_print(f"Adjusted X offset to bring marker into view (left): {self.offset.x()}", 2)
         elif final_marker_x > visible_right:
             self.offset.setX(self.offset.x() - (final_marker_x - visible_right))
-            debug_print(f"Adjusted X offset to bring marker into view (right): {self.offset.x()}", 2)
         
         if final_marker_y < visible_top:
             self.offset.setY(self.offset.y() + (visible_top - final_marker_y))
-            debug_print(f"Adjusted Y offset to bring marker into view (top): {self.offset.y()}", 2)
         elif final_marker_y > visible_bottom:
             self.offset.setY(self.offset.y() - (final_marker_y - visible_bottom))
-            debug_print(f"Adjusted Y offset to bring marker into view (bottom): {self.offset.y()}", 2)
         
-        # Final position check
-        final_marker_x = marker_viewport_x + self.offset.x()
-        final_marker_y = marker_viewport_y + self.offset.y()
-        debug_print(f"Final marker position after adjustments: ({final_marker_x}, {final_marker_y})", 2)
+        # This runs on every row selection, so the trace is only formatted when it will be shown
+        if debug_enabled(2):
+            debug_print(f"Centering on marker: position={self.marker_position}, "
+                        f"scaled image={scaled_width}x{scaled_height} at ({img_x}, {img_y}), "
+                        f"marker in viewport=({marker_viewport_x}, {marker_viewport_y}), "
+                        f"offset {old_offset} -> {self.offset}", 2)
         
-        self.update()
+        if self.offset != old_offset:
+            self.update()
 
     def set_zoom_level(self, scale):
         """Set zoom level to the specified scale factor"""
@@ -838,7 +1273,11 @@ class ImageDisplayWidget(QWidget):
             return
         
         # Ensure scale is within allowed range
-        self.scale_factor = max(min(scale, self.max_scale), self.min_scale)
+        scale = max(min(scale, self.max_scale), self.min_scale)
+        if scale == self.scale_factor:
+            # Selecting rows on one image sets the same zoom again; nothing to redo
+            return
+        self.scale_factor = scale
         # Emit signal for zoom change
         self.zoom_changed.emit(self.scale_factor)
         self.update()
@@ -866,6 +1305,10 @@ class ImageDisplayWidget(QWidget):
         
         debug_print(f"Fitting image to window: scale={scale_factor}", 1)
         
+        if scale_factor == self.scale_factor and self.offset.isNull():
+            # Already fitted
+            return
+        
         # Set the new scale factor
         self.scale_factor = scale_factor
         
@@ -2492,6 +2935,9 @@ class DikeViewerApp(QMainWindow):
         
         # Create image viewer
         self.image_viewer = ImageViewer()
+        # Source row of the last selected table row, whose markers are added when its image is shown
+        self.selected_row = None
+        self.image_viewer.image_loaded.connect(self.on_image_loaded)
         
         # Create table view with proxy model for filtering
         self.table_view = QTableView()
@@ -2508,6 +2954,12 @@ class DikeViewerApp(QMainWindow):
         self.table_view.horizontalHeader().setStretchLastSection(True)
         self.table_view.setAlternatingRowColors(True)
         self.table_view.setSortingEnabled(True)
+        # Rows keep the default height and text is elided rather than wrapped,
+        # so the view never has to measure cells to lay out rows
+        self.table_view.setWordWrap(False)
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_view.setVerticalScrollMode(QTableView.ScrollPerPixel)
+        self.table_view.setItemDelegate(DisplayTextDelegate(self.table_view))
         
         # Connect table selection to image loading
         self.table_view.selectionModel().selectionChanged.connect(self.on_row_selected)
@@ -2531,7 +2983,11 @@ class DikeViewerApp(QMainWindow):
         # Set default image directory to './data'
         self.set_default_image_directory()
         
-        # Try to find and load Excel file from data directory
+        # Try to find and load Excel file from data directory, reading it in the
+        # background so the window shows without waiting for the workbook
+        self.table_loader_pool = QThreadPool(self)
+        self.table_loader_pool.setMaxThreadCount(1)
+        self.table_load_count = None
         self.load_excel_from_data_dir()
         
         # Store the current filter
@@ -2607,25 +3063,20 @@ class DikeViewerApp(QMainWindow):
         all_button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
         self.filter_layout.addWidget(all_button)
         
-        # Find all image files in the directory
-        image_files = []
+        # Match the image files indexed by the viewer against the distinct photo names
         unique_prefixes = set()
         prefix_to_image = {}  # Maps prefix to image file path
-        
-        for filename in os.listdir(self.image_viewer.image_dir):
-            file_path = os.path.join(self.image_viewer.image_dir, filename)
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-                image_files.append(file_path)
-                
-                # Extract prefix (e.g., "0. 마전리" from filename)
-                for row in range(self.table_model.rowCount()):
-                    photo_name = self.table_model.get_photo_name(row)
-                    if photo_name and photo_name in filename:
-                        unique_prefixes.add(photo_name)
-                        # Store the first matching image file for this prefix
-                        if photo_name not in prefix_to_image:
-                            prefix_to_image[photo_name] = file_path
-                        break
+        photo_names = self.table_model.get_photo_names()
+        
+        for filename, file_path in self.image_viewer.image_files:
+            # Extract prefix (e.g., "0. 마전리" from filename)
+            for photo_name in photo_names:
+                if photo_name in filename:
+                    unique_prefixes.add(photo_name)
+                    # Store the first matching image file for this prefix
+                    if photo_name not in prefix_to_image:
+                        prefix_to_image[photo_name] = file_path
+                    break
         
         # Sort the prefixes for consistent ordering
         sorted_prefixes = sorted(list(unique_prefixes))
@@ -2677,10 +3128,8 @@ class DikeViewerApp(QMainWindow):
                     source_row = self.proxy_model.mapToSource(
                         self.proxy_model.index(proxy_row, 0)).row()
                     
-                    # Get X and Y coordinates (still at indices 9 and 10 in data array)
-                    x_coord = float(self.table_model.data[source_row][9])  # 좌표 X
-                    y_coord = float(self.table_model.data[source_row][10])  # 좌표 Y
-                    coordinates.append((x_coord, y_coord))
+                    # Get X and Y coordinates
+                    coordinates.append(self.table_model.get_pixel_coordinates(source_row))
                     # Use the display sequence number (proxy_row + 1)
                     sequence_numbers.append(proxy_row + 1)
                 except (ValueError, IndexError) as e:
@@ -2712,12 +3161,11 @@ class DikeViewerApp(QMainWindow):
                 
                 try:
                     # Get coordinates
-                    x_coord = float(self.table_model.data[source_row][9])  # 좌표 X
-                    y_coord = float(self.table_model.data[source_row][10])  # 좌표 Y
-                    debug_print(f"Found coordinates for {prefix}: X={x_coord}, Y={y_coord}", 1)
+                    x_pixel, y_pixel = self.table_model.get_pixel_coordinates(source_row)
+                    debug_print(f"Found coordinates for {prefix}: X={x_pixel}px, Y={y_pixel}px", 1)
                     
                     # Set marker
-                    self.image_viewer.set_marker(x_coord, y_coord)
+                    self.image_viewer.set_marker_px(x_pixel, y_pixel)
                     
                     # Check if we should center on the marker
                     if self.center_checkbox.isChecked():
@@ -2753,13 +3201,17 @@ class DikeViewerApp(QMainWindow):
         # Store current filter
         self.current_filter = prefix
         
+        # A filter has to see every row, not only those the view has fetched so far
+        if prefix:
+            self.table_model.fetch_rows(self.table_model.row_count)
+        
         # Apply filter to the proxy model - note that column 11 in data becomes column 12 in display
         self.proxy_model.setFilterKeyColumn(12)  # Filter on "사진 이름" column
         self.proxy_model.setFilterFixedString(prefix)
         
         # Update status bar with count
         filtered_count = self.proxy_model.rowCount()
-        total_count = self.table_model.rowCount()
+        total_count = self.table_model.row_count
         
         if prefix:
             self.statusBar().showMessage(f"Showing {filtered_count} of {total_count} records for {prefix}", 5000)
@@ -2780,68 +3232,67 @@ class DikeViewerApp(QMainWindow):
             photo_name = self.table_model.get_photo_name(source_row)
             debug_print(f"Photo name: {photo_name}", 1)
             
-            # Try to find and display the corresponding image
+            # Try to find and display the corresponding image; its markers are added
+            # once it is shown, as it may still be decoding in the background
+            self.selected_row = source_row
             if photo_name:
                 success = self.image_viewer.set_image_by_name(photo_name)
-                if success:
-                    # Collect coordinates for all rows with this photo name
-                    coordinates = []
-                    sequence_numbers = []
-                    primary_index = None
-                    
-                    # Loop through all rows in the source model to find matching photo names
-                    for row in range(self.table_model.rowCount()):
-                        row_photo_name = self.table_model.get_photo_name(row)
-                        if row_photo_name == photo_name:
-                            try:
-                                # Note: The actual columns in the data are now at index-1 due to sequence column
-                                x_coord = float(self.table_model.data[row][9])  # 좌표 X (still at index 9 in data array)
-                                y_coord = float(self.table_model.data[row][10])  # 좌표 Y (still at index 10 in data array)
-                                coordinates.append((x_coord, y_coord))
-                                
-                                # Find the display sequence number for this row
-                                for proxy_row in range(self.proxy_model.rowCount()):
-                                    if self.proxy_model.mapToSource(self.proxy_model.index(proxy_row, 0)).row() == row:
-                                        # Add the sequence number (proxy_row + 1)
-                                        sequence_numbers.append(proxy_row + 1)
-                                        break
-                                else:
-                                    # If row not found in proxy model (filtered out), use source row + 1
-                                    sequence_numbers.append(row + 1)
-                                
-                                # If this is the selected row, mark its index
-                                if row == source_row:
-                                    primary_index = len(coordinates) - 1
-                                
-                            except (ValueError, IndexError) as e:
-                                debug_print(f"Error getting coordinates for row {row}: {e}", 0)
-                    
-                    # Set all markers with primary indicated
-                    if coordinates:
-                        self.image_viewer.set_multiple_markers(coordinates, primary_index, sequence_numbers)
-                        debug_print(f"Added {len(coordinates)} markers to the image (primary: {primary_index})", 1)
-                        
-                        # Check if we should center on the selected marker
-                        if self.center_checkbox.isChecked():
-                            # Center on marker with 200% zoom
-                            debug_print("Centering enabled: Setting zoom level to 200%", 1)
-                            self.image_viewer.image_display.set_zoom_level(2.0)
-                            debug_print("Triggering center on marker", 1)
-                            self.image_viewer.image_display.center_on_marker()
-                        else:
-                            # Fit the image to the window instead of just resetting to 100%
-                            debug_print("Centering disabled: Fitting image to window", 1)
-                            self.image_viewer.image_display.fit_to_window()
-                    
-                elif self.image_viewer.image_dir:
+                if not success and self.image_viewer.image_dir:
                     QMessageBox.warning(
                         self, 
                         "Image Not Found", 
                         f"Could not find an image file containing '{photo_name}' in the selected directory."
                     )
 
+    def on_image_loaded(self, image_path):
+        """Add the markers of the selected row's photo once its image is shown"""
+        source_row = self.selected_row
+        photo_name = self.table_model.get_photo_name(source_row) if source_row is not None else None
+        if not photo_name or self.image_viewer.find_image_file(photo_name) != image_path:
+            return
+        
+        # Marker positions of all rows of the source model with this photo name,
+        # taken from the model's pixel arrays in one go
+        rows, xs, ys, rows_without_coords = self.table_model.get_photo_markers(photo_name)
+        for row in rows_without_coords.tolist():
+            debug_print(f"No image coordinates in row {row}", 0)
+        coordinates = list(zip(xs.tolist(), ys.tolist()))
+        
+        # If the selected row has a marker, mark its index
+        primary = np.flatnonzero(rows == source_row)
+        primary_index = int(primary[0]) if len(primary) else None
+        
+        # The display sequence number is the proxy row + 1, or the row's
+        # position in the file if it is filtered out of the proxy model
+        sequence_numbers = []
+        for row in rows.tolist():
+            proxy_row = self.proxy_model.mapFromSource(self.table_model.index(row, 0)).row()
+            if proxy_row < 0 and row >= self.table_model.loaded_rows:
+                # Not fetched by the view yet. Filtering fetches every row, so the
+                # table is unfiltered and the proxy row is the model row
+                proxy_row = row
+            sequence_numbers.append(proxy_row + 1 if proxy_row >= 0
+                                    else int(self.table_model.load_order[row]) + 1)
+        
+        # Set all markers with primary indicated
+        if coordinates:
+            self.image_viewer.set_multiple_markers(coordinates, primary_index, sequence_numbers)
+            debug_print(f"Added {len(coordinates)} markers to the image (primary: {primary_index})", 1)
+            
+            # Check if we should center on the selected marker
+            if self.center_checkbox.isChecked():
+                # Center on marker with 200% zoom
+                debug_print("Centering enabled: Setting zoom level to 200%", 1)
+                self.image_viewer.image_display.set_zoom_level(2.0)
+                debug_print("Triggering center on marker", 1)
+                self.image_viewer.image_display.center_on_marker()
+            else:
+                # Fit the image to the window instead of just resetting to 100%
+                debug_print("Centering disabled: Fitting image to window", 1)
+                self.image_viewer.image_display.fit_to_window()
+
     def load_excel_from_data_dir(self):
-        """Find and load Excel file from the data directory"""
+        """Find the Excel file in the data directory and start reading it in the background"""
         data_dir = os.path.join(os.getcwd(), "data")
         
         if not os.path.exists(data_dir):
@@ -2869,17 +3320,26 @@ class DikeViewerApp(QMainWindow):
         else:
             debug_print(f"Found target Excel file: {excel_path}", 1)
         
-        # Load the data from the Excel file
-        success = self.table_model.load_data_from_excel(excel_path)
-        
-        if success:
-            filename = os.path.basename(excel_path)
-            self.statusBar().showMessage(f"Loaded data from {filename}", 5000)
-            
-            # Update image filter buttons after loading data
-            self.update_image_filter_buttons()
+        # Load the data from the Excel file, reusing the parsed data from the last start
+        self.statusBar().showMessage(f"Loading data from {os.path.basename(excel_path)}...")
+        self.table_load_count = self.table_model.load_count
+        loader = TableLoader(self.table_model, excel_path)
+        loader.signals.loaded.connect(self.on_table_loaded)
+        self.table_loader_pool.start(loader)
+        return True
+    
+    def on_table_loaded(self, excel_path, df):
+        """Show the data read by TableLoader, unless another file was loaded meanwhile"""
+        if self.table_model.load_count != self.table_load_count:
+            return
+        if df is None:
+            self.statusBar().showMessage(f"Failed to load data from {os.path.basename(excel_path)}", 5000)
+            return
+        self.table_model.set_dataframe(df)
+        self.statusBar().showMessage(f"Loaded data from {os.path.basename(excel_path)}", 5000)
         
-        return success
+        # Update image filter buttons after loading data
+        self.update_image_filter_buttons()
     
     def load_excel_data(self):
         """Open a file dialog to select an Excel file"""
@@ -2919,6 +3379,21 @@ class DikeViewerApp(QMainWindow):
 
 
 # We need to customize the proxy model to reset sequence numbers in filtered view
+class DisplayTextDelegate(QStyledItemDelegate):
+    """Item delegate that only asks the model for the display text.
+
+    QStyledItemDelegate queries font, alignment, colours, check state and icon
+    for every cell it paints, each a Python call through the proxy and the
+    table model, which only ever provide text.
+    """
+    def initStyleOption(self, option, index):
+        option.index = index
+        text = index.data(Qt.DisplayRole)
+        if text is not None:
+            option.text = text
+            option.features |= QStyleOptionViewItem.HasDisplay
+
+
 class SequentialNumberProxyModel(QSortFilterProxyModel):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -2929,7 +3404,7 @@ class SequentialNumberProxyModel(QSortFilterProxyModel):
         if index.column() == 0:
             if role == Qt.DisplayRole:
                 # Return the visual position of this row + 1
-                return str(index.row() + 1)
+                return self.sourceModel().row_labels[index.row()]
             elif role == Qt.UserRole:  # For sorting
                 # Return a value that will sort properly in the expected direction
                 row_num = index.row() + 1
@@ -2939,14 +3414,9 @@ class SequentialNumberProxyModel(QSortFilterProxyModel):
         return super().data(index, role)
 
     def sort(self, column, order):
-        # Call the parent class's sort method
-        super().sort(column, order)
-        
-        # If we sorted by sequence number, we need to invalidate our display
-        # since the row numbers need to be recalculated
-        if column == 0:
-            self.beginResetModel()
-            self.endResetModel()
+        # The source model reorders its rows itself, and the proxy keeps that order,
+        # so neither sorting nor refiltering compares rows through data()
+        self.sourceModel().sort(column, order)
 
 
 if __name__ == "__main__":
@@ -2,12 +2,105 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                            QLabel, QProgressBar, QTextEdit, QMessageBox, QLineEdit)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from DikeModels import DikeRecord, SyncEvent, db
+from peewee import chunked
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import datetime
+import gzip
+import time
+from operator import itemgetter
 from PyQt5.QtCore import QSettings
 import webbrowser
 
+# orjson encodes and decodes the sync payloads much faster than the stdlib json module
+try:
+    import orjson
+    
+    def dump_json(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    
+    load_json = orjson.loads
+except ImportError:
+    def dump_json(obj):
+        return json.dumps(obj).encode('utf-8')
+    
+    load_json = json.loads
+
+# Number of records sent per bulk submit request
+SYNC_CHUNK_SIZE = 100
+
+# Default number of single record submissions in flight at once when the
+# server has no bulk endpoint; can be changed with the sync/max_workers setting
+SYNC_MAX_WORKERS = 8
+
+# Ids per UPDATE when stamping synced records; older SQLite builds
+# allow at most 999 bound variables per statement
+SYNC_UPDATE_BATCH_SIZE = 900
+
+# Seconds between log flushes from the worker to the dialog
+LOG_FLUSH_INTERVAL = 0.25
+
+# (connect, read) timeout in seconds of every sync request, so a stalled server
+# fails the request instead of hanging the worker
+SYNC_TIMEOUT = (10, 60)
+
+# Longest wait in seconds for a Retry-After before retrying a request
+SYNC_RETRY_AFTER_MAX = 30
+
+# Request bodies smaller than about one packet are not worth compressing
+GZIP_MIN_SIZE = 1500
+
+# DikeRecord columns sent as-is in the sync payload. The float columns have
+# REAL affinity, so SQLite already hands them back as float or None.
+RECORD_FIELDS = (
+    'unique_id', 'symbol', 'stratum', 'rock_type', 'era', 'map_sheet', 'address',
+    'distance', 'angle',
+    'x_coord_1', 'y_coord_1', 'lat_1', 'lng_1',
+    'x_coord_2', 'y_coord_2', 'lat_2', 'lng_2',
+    'memo', 'is_deleted',
+)
+get_record_fields = itemgetter(*RECORD_FIELDS)
+
+# Datetime columns, sent as ISO 8601 strings
+RECORD_DATE_FIELDS = ('modified_date', 'created_date')
+
+
+class SyncRetry(Retry):
+    """Retry policy that never sends a sync POST twice once the server may have handled it.
+
+    Connection errors are retried for every method, as urllib3 does, since the request
+    was never sent. Read errors and 502/504 are retried only for idempotent methods: the
+    upstream may well have processed the POST and a replay could create a second sync
+    event or submit records again. A POST is retried on a 503 with Retry-After, where
+    the server says it did not take the request.
+    """
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == 'POST':
+            return bool(self.total and self.respect_retry_after_header and has_retry_after
+                        and status_code == 503)
+        return super().is_retry(method, status_code, has_retry_after)
+    
+    def get_retry_after(self, response):
+        # Bounded, so a server asking for a long wait can't stall the sync
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, SYNC_RETRY_AFTER_MAX)
+
+
+def create_session(pool_size=SYNC_MAX_WORKERS):
+    """Create a session that reuses one keep-alive connection pool for every request of a sync"""
+    session = requests.Session()
+    retry = SyncRetry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
 
 class SyncWorker(QThread):
     """Worker thread to handle sync operations"""
@@ -15,181 +108,292 @@ class SyncWorker(QThread):
     error = pyqtSignal(str)
     finished = pyqtSignal(bool)
 
-    def __init__(self, base_url, records):
+    def __init__(self, base_url, records, max_workers=SYNC_MAX_WORKERS, read_time=None,
+                 gzip_requests=False):
         super().__init__()
         self.base_url = base_url
         self.records = records
+        # When the records were read from the database. Synced records are stamped with
+        # this, so a record changed while the sync runs is still newer than its stamp
+        self.read_time = read_time or datetime.datetime.now()
+        self.max_workers = max_workers
         self.sync_event = None
         self.event_id = None
+        self.bulk_supported = True
+        # Compressed bodies are only sent when enabled in the settings ('sync/gzip_requests'),
+        # since not every server decodes a Content-Encoding on requests
+        self.gzip_supported = gzip_requests
+        self.executor = None
+        self.session = None
+        self.synced_ids = []
+        self.log_buffer = []
+        self.last_log_flush = 0.0
+        
+    def log(self, message):
+        """Queue a log message; messages reach the dialog in batches to spare the GUI thread"""
+        self.log_buffer.append(message)
+        if time.monotonic() - self.last_log_flush >= LOG_FLUSH_INTERVAL:
+            self.flush_log()
+    
+    def flush_log(self):
+        """Send all queued log messages to the dialog as one progress signal"""
+        if self.log_buffer:
+            self.progress.emit('\n'.join(self.log_buffer))
+            self.log_buffer = []
+        self.last_log_flush = time.monotonic()
+    
+    def record_payload(self, record):
+        """Serialize a DikeRecord row dict into the dict expected by the sync server"""
+        payload = dict(zip(RECORD_FIELDS, get_record_fields(record)))
+        for key in RECORD_DATE_FIELDS:
+            value = record[key]
+            payload[key] = value.isoformat() if value is not None else None
+        return payload
+    
+    @staticmethod
+    def rejects_encoding(response):
+        """Return True if the server refused a request because of its Content-Encoding.
+
+        A 400 usually means the data itself was rejected, so it only counts when the
+        error names the encoding.
+        """
+        if response.status_code == 415:
+            return True
+        if response.status_code == 400:
+            text = response.text.lower()
+            return 'encoding' in text or 'gzip' in text
+        return False
+    
+    def post_json(self, url, obj):
+        """POST obj as JSON, gzip compressing large bodies if the server accepts them"""
+        body = dump_json(obj)
+        if self.gzip_supported and len(body) >= GZIP_MIN_SIZE:
+            response = self.session.post(url, data=gzip.compress(body, compresslevel=3),
+                                         headers={'Content-Encoding': 'gzip'},
+                                         timeout=SYNC_TIMEOUT)
+            if not self.rejects_encoding(response):
+                return response
+            # Server could not read the compressed body; resend this request as plain
+            # JSON and keep sending plain JSON from now on
+            self.gzip_supported = False
+        return self.session.post(url, data=body, timeout=SYNC_TIMEOUT)
+    
+    def submit_record(self, record):
+        """Submit a single record. Returns a (record, sync_result, result_message) tuple"""
+        try:
+            response = self.post_json(
+                f"{self.base_url}/submit-dike-record/",
+                {
+                    "event_id": self.event_id,
+                    "dike_record": self.record_payload(record)
+                }
+            )
+        except Exception as e:
+            return record, 'failed', str(e)
+        
+        if response.status_code == 201:
+            return record, 'success', 'Successfully synced'
+        return record, 'failed', f"Failed: {response.text}"
+    
+    def submit_records(self, chunk):
+        """Submit the records of a chunk one by one, several requests at a time.
+        
+        Returns a list of (record, sync_result, result_message) tuples in chunk order.
+        """
+        return list(self.executor.map(self.submit_record, chunk))
+    
+    def submit_chunk(self, chunk):
+        """Submit a chunk of records in a single request.
+        
+        Returns a list of (record, sync_result, result_message) tuples, one per record.
+        Falls back to per-record submission if the server has no bulk endpoint.
+        """
+        response = self.post_json(
+            f"{self.base_url}/submit-dike-records-bulk/",
+            {
+                "event_id": self.event_id,
+                "records": [self.record_payload(record) for record in chunk]
+            }
+        )
+        
+        if response.status_code == 404:
+            # Older server without the bulk endpoint
+            self.log("Bulk submit not supported by server, submitting records one by one")
+            self.bulk_supported = False
+            return self.submit_records(chunk)
+        
+        if response.status_code not in (200, 201):
+            return [(record, 'failed', f"Failed: {response.text}") for record in chunk]
+        
+        # Server answers with [{"unique_id": ..., "status": ..., "message": ...}, ...]
+        statuses = {item['unique_id']: item for item in load_json(response.content)}
+        results = []
+        for record in chunk:
+            item = statuses.get(record['unique_id'])
+            if item is None:
+                # The server may still have stored the record, so it is not posted again
+                # now; left unsynced, it goes out with the next sync
+                results.append((record, 'failed', 'Failed: no result from server'))
+            elif item.get('status') == 'success':
+                results.append((record, 'success', 'Successfully synced'))
+            else:
+                results.append((record, 'failed', f"Failed: {item.get('message', '')}"))
+        return results
         
+    def mark_synced(self, record_ids, sync_date):
+        """Set last_sync_date of the given records with as few UPDATE statements as possible"""
+        for batch in chunked(record_ids, SYNC_UPDATE_BATCH_SIZE):
+            (DikeRecord
+             .update({DikeRecord.last_sync_date: sync_date})
+             .where(DikeRecord.id.in_(batch))
+             .execute())
+    
+    def iter_results(self):
+        """Submit all records, yielding lists of (record, sync_result, result_message) tuples chunk by chunk"""
+        start = 0
+        while self.bulk_supported and start < len(self.records):
+            chunk = self.records[start:start + SYNC_CHUNK_SIZE]
+            start += len(chunk)
+            try:
+                yield self.submit_chunk(chunk)
+            except Exception as e:
+                yield [(record, 'failed', str(e)) for record in chunk]
+        
+        # Without a bulk endpoint, queue every remaining record up front so the pool
+        # keeps max_workers requests in flight across chunk boundaries
+        futures = [self.executor.submit(self.submit_record, record)
+                   for record in self.records[start:]]
+        for chunk in chunked(futures, SYNC_CHUNK_SIZE):
+            yield [future.result() for future in chunk]
+    
     def run(self):
+        # HTTP requests are made outside of any transaction; only the short
+        # local writes below hold the SQLite write lock.
+        self.session = create_session(self.max_workers)
         try:
-            with db.atomic() as transaction:
-                try:
-                    # Step 1: Create new sync event on server
-                    self.progress.emit("\nRequesting new sync event from server...")
-                    response = requests.post(f"{self.base_url}/sync-events/create_new/")
-                    
-                    if response.status_code != 200:
-                        raise Exception(f"Failed to create sync event: {response.text}")
-                    
-                    event_data = response.json()
-                    self.event_id = event_data['event_id']
-                    self.progress.emit(f"Received event_id: {self.event_id}")
-                    
-                    # Step 2: Create local sync event record
-                    self.sync_event = SyncEvent.create(
-                        event_id=self.event_id,
-                        status='in_progress',
-                        timestamp=datetime.datetime.now(),
-                        total_records=len(self.records)
-                    )
-                    
-                    # Step 3: Submit all records
-                    total_records = len(self.records)
-                    success_count = 0
-                    fail_count = 0
-                    sync_details = []
-                    
-                    self.progress.emit(f"\nStarting sync of {total_records} records...")
-                    
-                    for i, record in enumerate(self.records, 1):
-                        try:
-                            record_data = {
-                                "event_id": self.event_id,
-                                "dike_record": {
-                                    "unique_id": record.unique_id,
-                                    "symbol": record.symbol,
-                                    "stratum": record.stratum,
-                                    "rock_type": record.rock_type,
-                                    "era": record.era,
-                                    "map_sheet": record.map_sheet,
-                                    "address": record.address,
-                                    "distance": float(record.distance) if record.distance else None,
-                                    "angle": float(record.angle) if record.angle else None,
-                                    "x_coord_1": float(record.x_coord_1) if record.x_coord_1 else None,
-                                    "y_coord_1": float(record.y_coord_1) if record.y_coord_1 else None,
-                                    "lat_1": float(record.lat_1) if record.lat_1 else None,
-                                    "lng_1": float(record.lng_1) if record.lng_1 else None,
-                                    "x_coord_2": float(record.x_coord_2) if record.x_coord_2 else None,
-                                    "y_coord_2": float(record.y_coord_2) if record.y_coord_2 else None,
-                                    "lat_2": float(record.lat_2) if record.lat_2 else None,
-                                    "lng_2": float(record.lng_2) if record.lng_2 else None,
-                                    "memo": record.memo,
-                                    "modified_date": record.modified_date.isoformat() if record.modified_date else None,
-                                    "created_date": record.created_date.isoformat() if record.created_date else None,
-                                    "is_deleted": record.is_deleted
-                                }
-                            }
-                            
-                            # Only show progress every 10 records or on failure
-                            if i % 10 == 0:
-                                self.progress.emit(f"Syncing record {i}/{total_records}: {record.unique_id} ({record.symbol})")
-                            
-                            response = requests.post(
-                                f"{self.base_url}/submit-dike-record/",
-                                json=record_data
-                            )
-                            
-                            sync_result = 'success' if response.status_code == 201 else 'failed'
-                            result_message = ('Successfully synced' if response.status_code == 201 
-                                            else f"Failed: {response.text}")
-                            
-                            # Store sync result in details
-                            sync_details.append({
-                                'record_id': record.unique_id,
-                                'symbol': record.symbol,
-                                'result': sync_result,
-                                'message': result_message,
-                                'timestamp': datetime.datetime.now().isoformat()
-                            })
-                            
-                            if sync_result == 'success':
-                                # Update last_sync_date on successful sync
-                                record.last_sync_date = datetime.datetime.now()
-                                record.save()
-                                success_count += 1
-                            else:
-                                fail_count += 1
-                                self.progress.emit(
-                                    f"Failed to sync record {i}/{total_records} "
-                                    f"(ID: {record.unique_id}, Symbol: {record.symbol}): {response.text}"
-                                )
-                            
-                        except Exception as e:
-                            fail_count += 1
-                            error_msg = str(e)
-                            self.progress.emit(
-                                f"Error syncing record {i}/{total_records} "
-                                f"(ID: {record.unique_id}, Symbol: {record.symbol}): {error_msg}"
-                            )
-                            sync_details.append({
-                                'record_id': record.unique_id,
-                                'symbol': record.symbol,
-                                'result': 'failed',
-                                'message': error_msg,
-                                'timestamp': datetime.datetime.now().isoformat()
-                            })
-                    
-                    # Step 4: Update final sync status
-                    final_status = 'completed' if fail_count == 0 else 'completed_with_errors'
+            # Step 1: Create new sync event on server
+            self.log("\nRequesting new sync event from server...")
+            response = self.session.post(f"{self.base_url}/sync-events/create_new/",
+                                         timeout=SYNC_TIMEOUT)
+            
+            if response.status_code != 200:
+                raise Exception(f"Failed to create sync event: {response.text}")
+            
+            event_data = response.json()
+            self.event_id = event_data['event_id']
+            self.log(f"Received event_id: {self.event_id}")
+            
+            # Step 2: Create local sync event record
+            with db.atomic():
+                self.sync_event = SyncEvent.create(
+                    event_id=self.event_id,
+                    status='in_progress',
+                    timestamp=datetime.datetime.now(),
+                    total_records=len(self.records)
+                )
+            
+            # Step 3: Submit all records. Local writes stay on this thread;
+            # only the HTTP requests run on the pool.
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            total_records = len(self.records)
+            success_count = 0
+            fail_count = 0
+            sync_details = []
+            self.synced_ids = []
+            
+            self.log(f"\nStarting sync of {total_records} records...")
+            
+            processed = 0
+            for results in self.iter_results():
+                for record, sync_result, result_message in results:
+                    processed += 1
                     
-                    # Update sync event with final results
-                    self.sync_event.status = final_status
-                    self.sync_event.success_count = success_count
-                    self.sync_event.fail_count = fail_count
-                    self.sync_event.details = json.dumps(sync_details)
-                    self.sync_event.end_timestamp = datetime.datetime.now()
+                    # Store sync result in details as [unique_id, result, message];
+                    # the symbol is in the database and the times are on the sync event
+                    if sync_result == 'success':
+                        sync_details.append((record['unique_id'], sync_result, ''))
+                        self.synced_ids.append(record['id'])
+                        success_count += 1
+                    else:
+                        sync_details.append((record['unique_id'], sync_result, result_message))
+                        fail_count += 1
+                        self.log(
+                            f"Failed to sync record {processed}/{total_records} "
+                            f"(ID: {record['unique_id']}, Symbol: {record['symbol']}): {result_message}"
+                        )
+                
+                self.log(f"Synced {processed}/{total_records} records")
+            
+            # Step 4: Update final sync status
+            final_status = 'completed' if fail_count == 0 else 'completed_with_errors'
+            
+            # Update sync event with final results
+            self.sync_event.status = final_status
+            self.sync_event.success_count = success_count
+            self.sync_event.fail_count = fail_count
+            self.sync_event.details = dump_json(sync_details).decode('utf-8')
+            self.sync_event.end_timestamp = datetime.datetime.now()
+            with db.atomic():
+                self.mark_synced(self.synced_ids, self.read_time)
+                self.sync_event.save()
+            
+            # Notify server that sync is complete
+            self.log("\nNotifying server of sync completion...")
+            end_sync_response = self.session.post(
+                f"{self.base_url}/sync-events/{self.event_id}/end_sync/",
+                data=dump_json({
+                    "status": final_status,
+                    "error_message": f"{fail_count} records failed to sync" if fail_count > 0 else None
+                }),
+                timeout=SYNC_TIMEOUT
+            )
+            
+            if end_sync_response.status_code != 200:
+                self.log(f"Warning: Failed to notify server of sync completion: {end_sync_response.text}")
+            else:
+                self.log("Server notified of sync completion")
+            
+            # Show summary
+            self.log("\nSync completed!")
+            self.log(f"Total records: {total_records}")
+            self.log(f"Successfully synced: {success_count}")
+            self.log(f"Failed: {fail_count}")
+            
+            self.flush_log()
+            self.finished.emit(True)
+            
+        except Exception as e:
+            if self.sync_event:
+                # Update sync event with failure status
+                self.sync_event.status = 'failed'
+                self.sync_event.error_message = str(e)
+                self.sync_event.end_timestamp = datetime.datetime.now()
+                with db.atomic():
+                    # Keep the records that did get through marked as synced
+                    self.mark_synced(self.synced_ids, self.read_time)
                     self.sync_event.save()
-                    
-                    # Notify server that sync is complete
-                    self.progress.emit("\nNotifying server of sync completion...")
-                    end_sync_response = requests.post(
+                
+                # Try to notify server of failure
+                try:
+                    self.session.post(
                         f"{self.base_url}/sync-events/{self.event_id}/end_sync/",
-                        json={
-                            "status": final_status,
-                            "error_message": f"{fail_count} records failed to sync" if fail_count > 0 else None
-                        }
+                        data=dump_json({
+                            "status": "failed",
+                            "error_message": str(e)
+                        }),
+                        timeout=SYNC_TIMEOUT
                     )
-                    
-                    if end_sync_response.status_code != 200:
-                        self.progress.emit(f"Warning: Failed to notify server of sync completion: {end_sync_response.text}")
-                    else:
-                        self.progress.emit("Server notified of sync completion")
-                    
-                    # Show summary
-                    self.progress.emit("\nSync completed!")
-                    self.progress.emit(f"Total records: {total_records}")
-                    self.progress.emit(f"Successfully synced: {success_count}")
-                    self.progress.emit(f"Failed: {fail_count}")
-                    
-                    self.finished.emit(True)
-                    
-                except Exception as e:
-                    if self.sync_event:
-                        # Update sync event with failure status
-                        self.sync_event.status = 'failed'
-                        self.sync_event.error_message = str(e)
-                        self.sync_event.end_timestamp = datetime.datetime.now()
-                        self.sync_event.save()
-                        
-                        # Try to notify server of failure
-                        try:
-                            requests.post(
-                                f"{self.base_url}/sync-events/{self.event_id}/end_sync/",
-                                json={
-                                    "status": "failed",
-                                    "error_message": str(e)
-                                }
-                            )
-                        except Exception as notify_error:
-                            self.progress.emit(f"Warning: Failed to notify server of sync failure: {notify_error}")
-                    transaction.rollback()
-                    raise
-                    
-        except Exception as e:
+                except Exception as notify_error:
+                    self.log(f"Warning: Failed to notify server of sync failure: {notify_error}")
+            
+            self.flush_log()
             self.error.emit(str(e))
             self.finished.emit(False)
+        finally:
+            if self.executor:
+                # Drop queued submissions if the sync was aborted
+                self.executor.shutdown(cancel_futures=True)
+            self.session.close()
 
 class SyncDialog(QDialog):
     def __init__(self, parent=None):
@@ -262,6 +466,7 @@ class SyncDialog(QDialog):
 
 
     def log_message(self, message):
+        # The worker joins its queued messages, so a whole batch is one append
         self.log_text.append(message)
         
     def start_sync(self):
@@ -272,7 +477,9 @@ class SyncDialog(QDialog):
             self.settings.setValue('sync/server_url', new_url)
             self.settings.sync()
         
-        # Get records from parent window
+        # Get records from parent window, noting the time first: edits made from now
+        # on must stay newer than the sync stamp of the records
+        read_time = datetime.datetime.now()
         records = self.parent.get_records_to_sync()
         if not records:
             QMessageBox.warning(self, "No Data", 
@@ -295,7 +502,10 @@ class SyncDialog(QDialog):
         self.status_label.setText("Syncing...")
         
         # Create and start worker thread
-        self.worker = SyncWorker(self.base_url, records)
+        max_workers = self.settings.value('sync/max_workers', SYNC_MAX_WORKERS, type=int)
+        gzip_requests = self.settings.value('sync/gzip_requests', False, type=bool)
+        self.worker = SyncWorker(self.base_url, records, max(1, max_workers), read_time,
+                                 gzip_requests)
         self.worker.progress.connect(self.log_message)
         self.worker.error.connect(self.handle_error)
         self.worker.finished.connect(self.handle_sync_complete)
@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+from DikeUtils import save_dataframe
 
 # Define sample data with the required columns
 data = {
@@ -34,6 +35,6 @@ if not os.path.exists(data_dir):
 
 # Save to Excel file
 excel_path = os.path.join(data_dir, "dike_data.xlsx")
-df.to_excel(excel_path, index=False)
+save_dataframe(df, excel_path)
 
 print(f"Sample Excel file created at: {excel_path}") 
\ No newline at end of file
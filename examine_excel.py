@@ -1,6 +1,7 @@
-import pandas as pd
+import openpyxl
 import os
 import sys
+from DikeUtils import read_excel
 
 # Set console output encoding to UTF-8
 if sys.stdout.encoding != 'utf-8':
@@ -15,12 +16,17 @@ print(f"Examining Excel file: {excel_path}")
 print(f"File exists: {os.path.exists(excel_path)}")
 
 try:
-    # Read the Excel file
-    df = pd.read_excel(excel_path)
+    # Only the header and a few rows are shown, so don't load the whole sheet
+    df = read_excel(excel_path, nrows=3)
+    
+    # The row count comes from the sheet dimensions, read without parsing the cells
+    wb = openpyxl.load_workbook(excel_path, read_only=True, keep_links=False)
+    n_rows = wb.active.max_row - 1 if wb.active.max_row else None  # minus header row
+    wb.close()
     
     # Print basic information
-    print(f"\nDataFrame shape: {df.shape}")
-    print(f"Number of rows: {len(df)}")
+    print(f"\nDataFrame shape: ({n_rows}, {len(df.columns)})")
+    print(f"Number of rows: {n_rows}")
     print(f"Number of columns: {len(df.columns)}")
     
     # Print column names
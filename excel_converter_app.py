@@ -1,12 +1,16 @@
 import sys
 import os
+import datetime
 import pandas as pd
 import numpy as np
-from pyproj import Transformer
+from peewee import chunked
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QVBoxLayout, 
-                            QHBoxLayout, QWidget, QTableWidget, QTableWidgetItem, 
-                            QFileDialog, QMessageBox, QHeaderView)
-from DikeModels import DikeRecord, init_database
+                            QHBoxLayout, QWidget, QTableView, 
+                            QFileDialog, QMessageBox)
+from DikeModels import DikeRecord, init_database, db, generate_sortable_id, SQLITE_MAX_VARIABLES
+from DikeComponents import DataFrameModel, DEFAULT_COLUMN_WIDTH
+from DikeUtils import (fit_line, read_excel_columns, save_dataframe, dataframe_to_rows, PX_PER_CM,
+                       WGS84_TO_WEB_MERCATOR, WEB_MERCATOR_TO_WGS84)
 
 class ExcelConverterWindow(QMainWindow):
     def __init__(self):
@@ -42,8 +46,11 @@ class ExcelConverterWindow(QMainWindow):
         button_layout.addWidget(self.save_db_button)
         layout.addLayout(button_layout)
         
-        # Create table widget
-        self.table = QTableWidget(self)
+        # Create table view
+        self.table_model = DataFrameModel()
+        self.table = QTableView(self)
+        self.table.setModel(self.table_model)
+        self.table.horizontalHeader().setDefaultSectionSize(DEFAULT_COLUMN_WIDTH)
         layout.addWidget(self.table)
         
         self.show()
@@ -52,28 +59,8 @@ class ExcelConverterWindow(QMainWindow):
         if self.df is None:
             return
             
-        # Set table dimensions
-        self.table.setRowCount(len(self.df))
-        self.table.setColumnCount(len(self.df.columns))
-        
-        # Set headers
-        self.table.setHorizontalHeaderLabels(self.df.columns)
-        
-        # Fill data
-        for i in range(len(self.df)):
-            for j in range(len(self.df.columns)):
-                val = self.df.iloc[i, j]
-                if pd.isna(val):
-                    item = QTableWidgetItem('')
-                else:
-                    if isinstance(val, (float, np.float64)):
-                        item = QTableWidgetItem(f'{val:.6f}')
-                    else:
-                        item = QTableWidgetItem(str(val))
-                self.table.setItem(i, j, item)
-        
-        # Adjust column widths
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        # The model formats cells on demand, only for the rows in view
+        self.table_model.set_dataframe(self.df)
         
     def save_to_database(self):
         """Save the processed data to the database"""
@@ -104,26 +91,31 @@ class ExcelConverterWindow(QMainWindow):
 
             # Fix angle calculation
             if '각도' in self.df.columns:
-                # Apply the angle transformation row by row
-                self.df['각도'] = self.df['각도'].apply(lambda x: (90 - x + 360) % 360 if pd.notnull(x) else x)
+                self.df['각도'] = (90 - self.df['각도'] + 360) % 360
+
+            # Create one row per record from whole columns
+            records = dataframe_to_rows(self.df, column_mapping)
+            used_ids = {uid for (uid,) in DikeRecord.select(DikeRecord.unique_id).tuples()}
+            # One timestamp for the whole import instead of two per record
+            now = datetime.datetime.now()
+            for record_data in records:
+                # insert_many() bypasses DikeRecord.save(), so assign the unique_id here
+                unique_id = generate_sortable_id()
+                while unique_id in used_ids:
+                    unique_id = generate_sortable_id()
+                used_ids.add(unique_id)
+                record_data['unique_id'] = unique_id
+                record_data['created_date'] = now
+                record_data['modified_date'] = now
+
+            # Insert all rows in a single transaction, in chunks that stay
+            # under SQLite's parameter limit
+            if records:
+                chunk_size = SQLITE_MAX_VARIABLES // len(records[0])
+                with db.atomic():
+                    for chunk in chunked(records, chunk_size):
+                        DikeRecord.insert_many(chunk).execute()
 
-            # Create records for each row
-            records = []
-            for _, row in self.df.iterrows():
-                record_data = {}
-                for excel_col, db_field in column_mapping.items():
-                    if excel_col in self.df.columns:
-                        value = row[excel_col]
-                        # Convert NaN to None for database
-                        if pd.isna(value):
-                            value = None
-                        record_data[db_field] = value
-                
-                records.append(DikeRecord(**record_data))
-            
-            # Bulk insert records
-            DikeRecord.bulk_create(records)
-            
             QMessageBox.information(self, "Database Save Complete", 
                 f"Successfully saved {len(records)} records to the database.")
                 
@@ -141,10 +133,12 @@ class ExcelConverterWindow(QMainWindow):
             return  # User canceled
         
         try:
-            # Read the Excel file
-            self.df = pd.read_excel(file_name)
             column_header_text = "지역	기호	지층	대표암상	시대	각도	거리 (km)	주소	색	좌표 X	좌표 Y	사진 이름	코드1 좌표 Lat	코드 1 좌표 Lng"
-            column_header_list = column_header_text.split('\t')
+            # 도폭 (map sheet) is not shown in the mapper but is saved to the database
+            column_header_list = column_header_text.split('\t') + ['도폭']
+            
+            # Read the Excel file, skipping unused columns while parsing
+            self.df = read_excel_columns(file_name, column_header_list)
             
             # Define column names
             image_col = '사진 이름'
@@ -153,118 +147,88 @@ class ExcelConverterWindow(QMainWindow):
             lat_col = '코드1 좌표 Lat'
             lng_col = '코드 1 좌표 Lng'
             
-            # Add new columns for calculated coordinates
-            self.df['X_3857'] = np.nan
-            self.df['Y_3857'] = np.nan
-            self.df['Calculated_Lat'] = np.nan
-            self.df['Calculated_Lng'] = np.nan
-            self.df['Pixel_X'] = np.nan
-            self.df['Pixel_Y'] = np.nan
-            self.df['Pixel_Y_Flipped'] = np.nan
+            # Add new columns for calculated coordinates with a single allocation
+            new_columns = ['X_3857', 'Y_3857', 'Calculated_Lat', 'Calculated_Lng',
+                           'Pixel_X', 'Pixel_Y', 'Pixel_Y_Flipped']
+            self.df[new_columns] = np.full((len(self.df), len(new_columns)), np.nan)
             
-            # Copy existing lat/lng values to calculated columns
-            self.df.loc[self.df[lat_col].notna(), 'Calculated_Lat'] = self.df[lat_col]
-            self.df.loc[self.df[lng_col].notna(), 'Calculated_Lng'] = self.df[lng_col]
-            
-            # Create a transformer from WGS84 (EPSG:4326) to Web Mercator (EPSG:3857)
-            transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
-            transformer_back = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
-            
-            # Convert coordinate columns to float, replacing any non-numeric values with NaN
+            # Convert coordinate columns to numbers, replacing any non-numeric values
+            # (like '맥모양') with NaN
             for col in [x_col, y_col, lat_col, lng_col]:
                 self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
             
-            # Constants for coordinate conversion
-            CM_TO_INCH = 0.393701  # 1 cm = 0.393701 inches
-            DPI = 96  # dots per inch
+            # Copy existing lat/lng values to calculated columns as plain float64
+            self.df['Calculated_Lat'] = self.df[lat_col].astype('float64')
+            self.df['Calculated_Lng'] = self.df[lng_col].astype('float64')
+            
+            # Transformers between WGS84 (EPSG:4326) and Web Mercator (EPSG:3857)
+            transformer = WGS84_TO_WEB_MERCATOR
+            transformer_back = WEB_MERCATOR_TO_WGS84
             
-            # Process each image group
-            image_groups = self.df.groupby(image_col)
+            # Pixel positions of every row as float64, converted from cm once unless the
+            # coordinates are all whole numbers (pixels). The dtype alone cannot tell,
+            # since an empty cell turns an integer pixel column into floats.
+            pixel_x = self.df[x_col].astype('float64')
+            pixel_y = self.df[y_col].astype('float64')
+            if not ((pixel_x.dropna() % 1 == 0).all() and (pixel_y.dropna() % 1 == 0).all()):
+                pixel_x = (pixel_x * PX_PER_CM).round()
+                pixel_y = (pixel_y * PX_PER_CM).round()
+            
+            # Transform all known lat/lng coordinates to EPSG:3857 in one call
+            known = self.df[lat_col].notna() & self.df[lng_col].notna()
+            if known.any():
+                x_3857, y_3857 = transformer.transform(self.df['Calculated_Lng'].to_numpy()[known],
+                                                       self.df['Calculated_Lat'].to_numpy()[known])
+                self.df.loc[known, 'X_3857'] = x_3857
+                self.df.loc[known, 'Y_3857'] = y_3857
+            
+            # Number of rows of each image, and its rows with known lat/lng coordinates
+            image_sizes = self.df.groupby(image_col).size()
+            known_by_image = dict(list(self.df[known].groupby(image_col)))
+            
+            # Maximum y pixel of the known coordinates of each image, used to invert the y axis
+            max_y_by_image = pixel_y[known].groupby(self.df.loc[known, image_col]).max()
             
             # Store transformation parameters for each image
             image_transforms = {}
+            # Images with enough known coordinates to show their control points
+            control_images = []
             
             # First pass: Calculate transformation parameters for each image
-            for image_name, group_df in image_groups:
+            for image_name, image_size in image_sizes.items():
                 print(f"\nProcessing image: {image_name}")
-                print(f"Number of rows: {len(group_df)}")
+                print(f"Number of rows: {image_size}")
                 
                 # Get rows with lat/lng coordinates
-                known_coords = group_df[group_df[lat_col].notna() & group_df[lng_col].notna()]
+                known_coords = known_by_image.get(image_name)
                 
-                if len(known_coords) >= 2:
+                if known_coords is not None and len(known_coords) >= 2:
                     print(f"Found {len(known_coords)} rows with known coordinates")
+                    control_images.append(image_name)
                     
-                    # Lists to store coordinates
-                    x_pixels = []
-                    y_pixels = []
-                    x_3857_coords = []
-                    y_3857_coords = []
-                    max_y = float('-inf')
+                    max_y = max_y_by_image[image_name]
                     
-                    # First pass to find maximum y value
-                    for _, row in known_coords.iterrows():
-                        y_cm = row[y_col]
-                        if pd.notna(y_cm):
-                            if isinstance(y_cm, float):
-                                y_val = round(y_cm * CM_TO_INCH * DPI)
-                            else:
-                                y_val = y_cm
-                            max_y = max(max_y, y_val)
+                    # Process known coordinates that have pixel positions
+                    valid = known_coords[known_coords[x_col].notna() & known_coords[y_col].notna()]
                     
-                    # Process known coordinates
-                    for _, row in known_coords.iterrows():
-                        try:
-                            # Convert cm to pixels if the coordinates are floats
-                            x_cm, y_cm = row[x_col], row[y_col]
-                            if isinstance(x_cm, float) and isinstance(y_cm, float):
-                                x_val = round(x_cm * CM_TO_INCH * DPI)
-                                y_val = round(y_cm * CM_TO_INCH * DPI)
-                            else:
-                                x_val = x_cm
-                                y_val = y_cm
-                            
-                            # Store pixel coordinates
-                            self.df.at[row.name, 'Pixel_X'] = x_val
-                            self.df.at[row.name, 'Pixel_Y'] = y_val
-                            
-                            # Invert y coordinate
-                            y_val_flipped = max_y - y_val
-                            self.df.at[row.name, 'Pixel_Y_Flipped'] = y_val_flipped
-                            
-                            # Transform lat/lng to EPSG:3857
-                            x_3857, y_3857 = transformer.transform(row[lng_col], row[lat_col])
-                            self.df.at[row.name, 'X_3857'] = x_3857
-                            self.df.at[row.name, 'Y_3857'] = y_3857
-                            
-                            x_pixels.append(x_val)
-                            y_pixels.append(y_val_flipped)
-                            x_3857_coords.append(x_3857)
-                            y_3857_coords.append(y_3857)
-                            
-                        except Exception as e:
-                            print(f"Error transforming coordinates for row {row.name}: {str(e)}")
-                            continue
+                    # Invert y coordinate of the pixel positions
+                    x_pixels = pixel_x[valid.index].to_numpy()
+                    y_pixels = max_y - pixel_y[valid.index].to_numpy()
+                    
+                    # EPSG:3857 coordinates were transformed above
+                    x_3857_coords = valid['X_3857'].to_numpy()
+                    y_3857_coords = valid['Y_3857'].to_numpy()
                     
                     if len(x_pixels) >= 2:
-                        # Convert to numpy arrays
-                        x_pixels = np.array(x_pixels)
-                        y_pixels = np.array(y_pixels)
-                        x_3857_coords = np.array(x_3857_coords)
-                        y_3857_coords = np.array(y_3857_coords)
-                        
                         try:
                             # Calculate x transformation (simple linear regression)
-                            A_x = np.vstack([x_pixels, np.ones(len(x_pixels))]).T
-                            x_slope, x_intercept = np.linalg.lstsq(A_x, x_3857_coords, rcond=None)[0]
+                            x_slope, x_intercept = fit_line(x_pixels, x_3857_coords)
                             
                             # Calculate y transformation (simple linear regression)
-                            A_y = np.vstack([y_pixels, np.ones(len(y_pixels))]).T
-                            y_slope, y_intercept = np.linalg.lstsq(A_y, y_3857_coords, rcond=None)[0]
+                            y_slope, y_intercept = fit_line(y_pixels, y_3857_coords)
                             
                             # Store transformation parameters
                             image_transforms[image_name] = {
-                                'max_y': max_y,
                                 'x_slope': x_slope,
                                 'x_intercept': x_intercept,
                                 'y_slope': y_slope,
@@ -285,53 +249,49 @@ class ExcelConverterWindow(QMainWindow):
             # Second pass: Calculate coordinates for all rows
             print("\nCalculating coordinates for all rows...")
             
-            for idx, row in self.df.iterrows():
-                image_name = row[image_col]
-                transform = image_transforms.get(image_name)
+            # Number each image with a transformation once, so that its parameters
+            # can be looked up for every row by array indexing
+            image_ids = self.df[image_col].map(
+                {image_name: i for i, image_name in enumerate(image_transforms)})
+            has_transform = image_ids.notna()
+            for image_name in self.df.loc[~has_transform, image_col].unique():
+                print(f"No transformation available for image {image_name}")
+            
+            # Store pixel positions for every row of an image with a transformation,
+            # and for the known coordinates of the other images with control points
+            has_pixels = self.df[x_col].notna() & self.df[y_col].notna()
+            shown = has_pixels & (has_transform | (known & self.df[image_col].isin(control_images)))
+            self.df.loc[shown, 'Pixel_X'] = pixel_x[shown]
+            self.df.loc[shown, 'Pixel_Y'] = pixel_y[shown]
+            self.df.loc[shown, 'Pixel_Y_Flipped'] = (self.df[image_col].map(max_y_by_image) - pixel_y)[shown]
+            
+            valid = (has_transform & has_pixels).to_numpy()
+            if valid.any():
+                ids = image_ids.to_numpy()[valid].astype(int)
+                # One (images x parameters) table, gathered for all rows with a single take
+                params = np.array([
+                    [transform['x_slope'], transform['x_intercept'],
+                     transform['y_slope'], transform['y_intercept']]
+                    for transform in image_transforms.values()
+                ])
+                x_slope, x_intercept, y_slope, y_intercept = params.take(ids, axis=0).T
+                
+                # Calculate EPSG:3857 coordinates from the pixel positions stored above
+                x_3857 = x_slope * self.df['Pixel_X'].to_numpy()[valid] + x_intercept
+                y_3857 = y_slope * self.df['Pixel_Y_Flipped'].to_numpy()[valid] + y_intercept
                 
-                if transform is None:
-                    print(f"No transformation available for image {image_name}")
-                    continue
+                # Keep the transformed known coordinates, fill in the rest
+                rows = self.df.index[valid]
+                fill = self.df['X_3857'].isna().to_numpy()[valid]
+                self.df.loc[rows[fill], 'X_3857'] = x_3857[fill]
+                self.df.loc[rows[fill], 'Y_3857'] = y_3857[fill]
                 
-                try:
-                    # Convert coordinates
-                    x_cm, y_cm = row[x_col], row[y_col]
-                    if pd.notna(x_cm) and pd.notna(y_cm):
-                        if isinstance(x_cm, float) and isinstance(y_cm, float):
-                            x_val = round(x_cm * CM_TO_INCH * DPI)
-                            y_val = round(y_cm * CM_TO_INCH * DPI)
-                        else:
-                            x_val = x_cm
-                            y_val = y_cm
-                        
-                        # Store pixel coordinates if not already stored
-                        if pd.isna(self.df.at[idx, 'Pixel_X']):
-                            self.df.at[idx, 'Pixel_X'] = x_val
-                            self.df.at[idx, 'Pixel_Y'] = y_val
-                        
-                        # Invert y coordinate
-                        y_val_flipped = transform['max_y'] - y_val
-                        if pd.isna(self.df.at[idx, 'Pixel_Y_Flipped']):
-                            self.df.at[idx, 'Pixel_Y_Flipped'] = y_val_flipped
-                        
-                        # Calculate EPSG:3857 coordinates
-                        x_3857 = transform['x_slope'] * x_val + transform['x_intercept']
-                        y_3857 = transform['y_slope'] * y_val_flipped + transform['y_intercept']
-                        
-                        # Store EPSG:3857 coordinates if not already stored
-                        if pd.isna(self.df.at[idx, 'X_3857']):
-                            self.df.at[idx, 'X_3857'] = x_3857
-                            self.df.at[idx, 'Y_3857'] = y_3857
-                        
-                        # Calculate and store WGS84 coordinates if not already present
-                        if pd.isna(row[lat_col]) or pd.isna(row[lng_col]):
-                            lng, lat = transformer_back.transform(x_3857, y_3857)
-                            self.df.at[idx, 'Calculated_Lat'] = lat
-                            self.df.at[idx, 'Calculated_Lng'] = lng
-                        
-                except Exception as e:
-                    print(f"Error processing row {idx}: {str(e)}")
-                    continue
+                # Calculate WGS84 coordinates where not already present
+                fill = (self.df[lat_col].isna() | self.df[lng_col].isna()).to_numpy()[valid]
+                if fill.any():
+                    lngs, lats = transformer_back.transform(x_3857[fill], y_3857[fill])
+                    self.df.loc[rows[fill], 'Calculated_Lat'] = lats
+                    self.df.loc[rows[fill], 'Calculated_Lng'] = lngs
             
             # Update the table with the new data
             self.update_table()
@@ -348,16 +308,20 @@ class ExcelConverterWindow(QMainWindow):
         if self.df is None:
             return
             
-        file_name, _ = QFileDialog.getSaveFileName(
-            self, "Save Excel File", "", "Excel Files (*.xlsx);;All Files (*)"
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save Excel File", "",
+            "Excel Files (*.xlsx);;Parquet Files (*.parquet);;All Files (*)"
         )
         
         if not file_name:
             return  # User canceled
+        
+        if selected_filter.startswith("Parquet") and not file_name.lower().endswith('.parquet'):
+            file_name += '.parquet'
             
         try:
-            # Save the DataFrame to Excel
-            self.df.to_excel(file_name, index=False)
+            # Save the DataFrame to Excel (or Parquet)
+            save_dataframe(self.df, file_name)
             QMessageBox.information(self, "Save Complete", 
                 f"Data has been saved to:\n{file_name}")
         except Exception as e:
@@ -57,11 +57,11 @@ def migrate(db):
     
     if records:
         print(f"Generating unique_ids for {len(records)} records...")
-        for record in records:
-            unique_id = generate_sortable_id()
-            db.execute_sql(
+        params = [(generate_sortable_id(), record[0]) for record in records]
+        with db.atomic():
+            db.connection().executemany(
                 'UPDATE dikerecord SET unique_id = ? WHERE id = ?',
-                (unique_id, record[0])
+                params
             )
     else:
         print("All records have unique_ids")
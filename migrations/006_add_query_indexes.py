@@ -0,0 +1,23 @@
+"""Migration to add indexes for the soft-delete and sync status queries"""
+from peewee import *
+
+def migrate(db):
+    """Write your migrations here."""
+    # DikeRecord.active() / deleted() filter on is_deleted, and the record
+    # list is ordered by created_date. A partial index (WHERE is_deleted = 0)
+    # would not be used since peewee binds the is_deleted value as a parameter.
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS idx_dikerecord_is_deleted '
+        'ON dikerecord(is_deleted, created_date)'
+    )
+    
+    # Sync events are looked up by status and time
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS idx_syncevent_status ON syncevent(status, timestamp)'
+    )
+
+
+def rollback(db):
+    """Write your rollback migrations here."""
+    db.execute_sql('DROP INDEX IF EXISTS idx_dikerecord_is_deleted')
+    db.execute_sql('DROP INDEX IF EXISTS idx_syncevent_status')
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from DikeUtils import fit_line, dataframe_to_rows
+
+def test_fit_line_matches_polyfit():
+    # Pixel positions against EPSG:3857 metres, as fitted per image
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 4000, 50)
+    y = 14_100_000 + 2.5 * x + rng.normal(0, 3, 50)
+
+    slope, intercept = fit_line(x, y)
+    expected_slope, expected_intercept = np.polyfit(x, y, 1)
+    assert slope == pytest.approx(expected_slope, rel=1e-9)
+    assert intercept == pytest.approx(expected_intercept, rel=1e-9)
+
+def test_fit_line_two_points():
+    slope, intercept = fit_line(np.array([100.0, 300.0]), np.array([10.0, 50.0]))
+    assert slope == pytest.approx(0.2)
+    assert intercept == pytest.approx(-10.0)
+
+def test_fit_line_equal_x_raises():
+    # Points all at one pixel column have no slope; the callers catch this and skip the image
+    with pytest.raises(np.linalg.LinAlgError):
+        fit_line(np.array([250.0, 250.0, 250.0]), np.array([1.0, 2.0, 3.0]))
+
+def test_dataframe_to_rows_nan_becomes_none():
+    df = pd.DataFrame({
+        '기호': ['Kqv', np.nan, 'Jgr'],
+        '각도': [45.0, np.nan, 120.5],
+        '거리 (km)': [1, 2, 3],
+    })
+    rows = dataframe_to_rows(df, {'기호': 'symbol', '각도': 'angle', '거리 (km)': 'distance'})
+    assert rows == [
+        {'symbol': 'Kqv', 'angle': 45.0, 'distance': 1},
+        {'symbol': None, 'angle': None, 'distance': 2},
+        {'symbol': 'Jgr', 'angle': 120.5, 'distance': 3},
+    ]
+    # Plain Python values, which sqlite3 can bind, not numpy scalars
+    assert type(rows[0]['angle']) is float
+    assert type(rows[0]['distance']) is int
+
+def test_dataframe_to_rows_skips_missing_columns():
+    df = pd.DataFrame({'기호': ['Kqv', 'Jgr'], '메모': ['a', 'b']})
+    rows = dataframe_to_rows(df, {'기호': 'symbol', '지층': 'stratum', '주소': 'address'})
+    # Columns absent from the sheet are left out, so the database defaults apply
+    assert rows == [{'symbol': 'Kqv'}, {'symbol': 'Jgr'}]
@@ -0,0 +1,117 @@
+import datetime
+import json
+from concurrent.futures import ThreadPoolExecutor
+from DikeModels import DikeRecord, db, init_database
+from SyncDialog import SyncWorker, RECORD_FIELDS
+
+BASE_URL = "http://sync.test/dikesync"
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+
+class FakeSession:
+    """Answers POSTs from a function of (url, payload) and records every call"""
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        payload = json.loads(data)
+        self.calls.append((url, payload))
+        return self.respond(url, payload)
+
+def make_record(number):
+    record = dict.fromkeys(RECORD_FIELDS)
+    record.update(id=number, unique_id=f"ID{number:08d}", symbol=f"S{number}",
+                  modified_date=datetime.datetime(2025, 3, 26, 12, 0),
+                  created_date=datetime.datetime(2025, 3, 26, 9, 0))
+    return record
+
+def make_worker(respond):
+    worker = SyncWorker(BASE_URL, [])
+    worker.event_id = 'EVT1'
+    worker.session = FakeSession(respond)
+    worker.executor = ThreadPoolExecutor(max_workers=2)
+    return worker
+
+def test_submit_chunk_bulk_results():
+    chunk = [make_record(1), make_record(2)]
+    def respond(url, payload):
+        assert url == f"{BASE_URL}/submit-dike-records-bulk/"
+        assert payload['event_id'] == 'EVT1'
+        assert [r['unique_id'] for r in payload['records']] == ['ID00000001', 'ID00000002']
+        return FakeResponse(201, [
+            {"unique_id": "ID00000001", "status": "success"},
+            {"unique_id": "ID00000002", "status": "failed", "message": "duplicate"},
+        ])
+    worker = make_worker(respond)
+
+    results = worker.submit_chunk(chunk)
+    assert [(r['unique_id'], status, message) for r, status, message in results] == [
+        ('ID00000001', 'success', 'Successfully synced'),
+        ('ID00000002', 'failed', 'Failed: duplicate'),
+    ]
+    assert worker.bulk_supported
+
+def test_submit_chunk_missing_results_are_not_resent():
+    chunk = [make_record(1), make_record(2), make_record(3)]
+    worker = make_worker(lambda url, payload: FakeResponse(200, [
+        {"unique_id": "ID00000002", "status": "success"},
+    ]))
+
+    results = worker.submit_chunk(chunk)
+    assert [(r['unique_id'], status) for r, status, _ in results] == [
+        ('ID00000001', 'failed'), ('ID00000002', 'success'), ('ID00000003', 'failed'),
+    ]
+    assert results[0][2] == 'Failed: no result from server'
+    # The server may have stored the missing records, so nothing is posted again
+    assert len(worker.session.calls) == 1
+
+def test_submit_chunk_error_fails_whole_chunk():
+    chunk = [make_record(1), make_record(2)]
+    worker = make_worker(lambda url, payload: FakeResponse(500, {"detail": "server error"}))
+
+    results = worker.submit_chunk(chunk)
+    assert [status for _, status, _ in results] == ['failed', 'failed']
+    assert all('server error' in message for _, _, message in results)
+    assert worker.bulk_supported
+    assert len(worker.session.calls) == 1
+
+def test_submit_chunk_falls_back_to_single_records_on_404():
+    chunk = [make_record(1), make_record(2)]
+    def respond(url, payload):
+        if url.endswith('/submit-dike-records-bulk/'):
+            return FakeResponse(404, {"detail": "Not found"})
+        assert url == f"{BASE_URL}/submit-dike-record/"
+        if payload['dike_record']['unique_id'] == 'ID00000001':
+            return FakeResponse(201, {})
+        return FakeResponse(400, {"symbol": ["invalid"]})
+    worker = make_worker(respond)
+
+    results = worker.submit_chunk(chunk)
+    assert [(r['unique_id'], status) for r, status, _ in results] == [
+        ('ID00000001', 'success'), ('ID00000002', 'failed'),
+    ]
+    assert not worker.bulk_supported
+    # One bulk attempt, then one request per record
+    assert len(worker.session.calls) == 3
+
+def test_mark_synced(tmp_path):
+    init_database(str(tmp_path / 'sync.db'))
+    db.connect(reuse_if_open=True)
+    try:
+        records = [DikeRecord.create(unique_id=f"ID{number:08d}", symbol=f"S{number}")
+                   for number in range(5)]
+        sync_date = datetime.datetime(2025, 3, 26, 12, 0)
+        synced_ids = [records[0].id, records[2].id, records[4].id]
+
+        SyncWorker(BASE_URL, []).mark_synced(synced_ids, sync_date)
+
+        stamped = {record.id: record.last_sync_date for record in DikeRecord.select()}
+        assert {id_ for id_, date in stamped.items() if date is not None} == set(synced_ids)
+        assert stamped[records[0].id] == sync_date
+    finally:
+        db.close()